@@ -0,0 +1,231 @@
+"""
+Stream word datasets in and out of the `words` table.
+
+    python -m app.commands.words import words.jsonl
+    python -m app.commands.words import words.csv --replace
+    python -m app.commands.words export words.jsonl
+
+JSONL rows look like `{"en": ["apple"], "uz": ["olma"]}`. CSV files have
+`en` and `uz` columns with variants separated by `|`. Rows are read,
+validated and inserted in fixed-size chunks, each in its own short
+transaction, so memory stays constant and no long lock is held.
+
+`--replace` deletes the existing words and imports the file in a single
+transaction that is rolled back if the import fails or imports nothing.
+Readers keep seeing the old dictionary until it commits; only writes to
+`words` wait for it. It refuses to run while reviews exist, since they
+point at word ids. Game history keeps the old word ids of past answers.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from app.core.config import DATABASE_CONFIG, settings
+from app.models.models import Review, Word
+
+LANGUAGES = ("en", "uz")
+VARIANT_SEPARATOR = "|"
+MAX_REPORTED_ERRORS = 20
+
+
+class InvalidWord(ValueError):
+    pass
+
+
+class ImportAborted(Exception):
+    pass
+
+
+def validate_word(row) -> Dict[str, List[str]]:
+    """Check a row against the `Word.data` shape and return the clean dict."""
+    if not isinstance(row, dict):
+        raise InvalidWord("expected an object with 'en' and 'uz'")
+    word = {}
+    for language in LANGUAGES:
+        variants = row.get(language)
+        if not isinstance(variants, list) or not variants:
+            raise InvalidWord(f"'{language}' must be a non-empty list")
+        clean = []
+        for variant in variants:
+            if not isinstance(variant, str) or not variant.strip():
+                raise InvalidWord(f"'{language}' must contain non-empty strings")
+            clean.append(variant.strip())
+        word[language] = clean
+    return word
+
+
+def detect_format(path: Path, format: str) -> str:
+    if format != "auto":
+        return format
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+def read_rows(path: Path, format: str) -> Iterator[Tuple[int, object]]:
+    """Yield `(line number, raw row)` without loading the whole file."""
+    with path.open(newline="", encoding="utf-8") as file:
+        if format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, {
+                    language: [
+                        variant
+                        for variant in (row.get(language) or "").split(
+                            VARIANT_SEPARATOR
+                        )
+                        if variant.strip()
+                    ]
+                    for language in LANGUAGES
+                }
+            return
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, error
+
+
+async def insert_chunk(chunk: List[Word], connection=None):
+    if connection is not None:
+        await Word.bulk_create(chunk, using_db=connection)
+        return
+    async with in_transaction() as connection:
+        await Word.bulk_create(chunk, using_db=connection)
+
+
+async def insert_rows(
+    path: Path, format: str, chunk_size: int, connection=None
+) -> Tuple[int, int]:
+    imported = skipped = 0
+    chunk: List[Word] = []
+    for line_number, row in read_rows(path, format):
+        try:
+            if isinstance(row, Exception):
+                raise InvalidWord(str(row))
+            chunk.append(Word(data=validate_word(row)))
+        except InvalidWord as error:
+            skipped += 1
+            if skipped <= MAX_REPORTED_ERRORS:
+                print(f"{path}:{line_number}: {error}", file=sys.stderr)
+            continue
+        if len(chunk) >= chunk_size:
+            await insert_chunk(chunk, connection)
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        await insert_chunk(chunk, connection)
+        imported += len(chunk)
+    return imported, skipped
+
+
+async def import_words(path: Path, format: str, chunk_size: int, replace: bool):
+    if replace:
+        if await Review.exists():
+            raise ImportAborted(
+                "Refusing to replace words while reviews exist; "
+                "their word ids would no longer match."
+            )
+        async with in_transaction() as connection:
+            await Word.all().using_db(connection).delete()
+            imported, skipped = await insert_rows(
+                path, format, chunk_size, connection
+            )
+            if not imported:
+                raise ImportAborted(
+                    f"No valid words in {path} ({skipped} invalid rows), "
+                    "the existing words were kept."
+                )
+    else:
+        imported, skipped = await insert_rows(path, format, chunk_size)
+    print(f"Imported {imported} words, skipped {skipped} invalid rows.")
+    await print_dimensions()
+
+
+async def export_words(path: Path, format: str, chunk_size: int):
+    exported = 0
+    last_id = 0
+    with path.open("w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file) if format == "csv" else None
+        if writer:
+            writer.writerow(LANGUAGES)
+        while True:
+            rows = (
+                await Word.filter(id__gt=last_id)
+                .order_by("id")
+                .limit(chunk_size)
+                .values_list("id", "data")
+            )
+            if not rows:
+                break
+            for word_id, data in rows:
+                if writer:
+                    writer.writerow(
+                        [
+                            VARIANT_SEPARATOR.join(data.get(language, []))
+                            for language in LANGUAGES
+                        ]
+                    )
+                else:
+                    file.write(json.dumps(data, ensure_ascii=False) + "\n")
+            exported += len(rows)
+            last_id = rows[-1][0]
+    print(f"Exported {exported} words to {path}.")
+
+
+async def print_dimensions():
+    """Book and unit counts for the current table size."""
+    words_count = await Word.all().count()
+    units_count = -(-words_count // settings.WORDS_IN_ONE_UNIT)
+    books_count = -(-units_count // settings.UNITS_IN_ONE_BOOK)
+    print(
+        f"Dictionary now has {words_count} words: {units_count} units of "
+        f"{settings.WORDS_IN_ONE_UNIT} words in {books_count} books of "
+        f"{settings.UNITS_IN_ONE_BOOK} units."
+    )
+
+
+async def run(args):
+    await Tortoise.init(config=DATABASE_CONFIG)
+    try:
+        path = Path(args.path)
+        format = detect_format(path, args.format)
+        if args.command == "import":
+            await import_words(path, format, args.chunk_size, args.replace)
+        else:
+            await export_words(path, format, args.chunk_size)
+    except ImportAborted as error:
+        raise SystemExit(str(error))
+    finally:
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("import", "export"):
+        subparser = subparsers.add_parser(command)
+        subparser.add_argument("path")
+        subparser.add_argument(
+            "--format", choices=("auto", "jsonl", "csv"), default="auto"
+        )
+        subparser.add_argument("--chunk-size", type=int, default=1000)
+        if command == "import":
+            subparser.add_argument(
+                "--replace",
+                action="store_true",
+                help="replace the existing words in one transaction",
+            )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
 import secrets
 
 from pathlib import Path
+from typing import Dict, Optional
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.services.backplane import create_backplane
 from app.services.connection_manager import ConnectionManager
+from app.services.friend_graph import FriendGraph
+from app.services.game_history import GameHistoryWriter
+from app.services.game_registry import create_game_registry
+from app.services.leaderboard import Leaderboards
+from app.services.log_pipeline import LogPipeline
+from app.services.loop_monitor import LoopMonitor
+from app.services.metrics import Metrics
+from app.services.password_hasher import PasswordHasher
+from app.services.request_counters import RequestCounters
+from app.services.review_scheduler import ReviewScheduler
+from app.services.round_scheduler import RoundScheduler
+from app.services.user_cache import UserCache
+from app.services.user_search import UserSearchIndex
+from app.services.word_catalog import WordCatalog
+from app.services.word_sampler import WordSampler
+from app.services.word_search import WordSearchIndex
 
 
 class Settings(BaseSettings):
@@ -18,14 +36,26 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str
+    DATABASE_URI: Optional[str] = None
 
     WORDS_COUNT: int = 3600
     WORDS_IN_ONE_UNIT: int = 20
     UNITS_IN_ONE_BOOK: int = 30
     BOOKS_COUNT: int = 6
+    WORD_CATALOG_REFRESH_INTERVAL: int = 300
+    REVIEW_CACHE_SIZE: int = 10000
+    REVIEW_BATCH_SIZE: int = 500
+    REVIEW_FLUSH_INTERVAL: float = 2.0
+    REVIEW_MAX_ATTEMPTS: int = 5
 
     ROUND_DURATION: int = 10
     ROUND_WORDS_COUNT: int = 10
+    ANSWER_MAX_TYPOS: int = 0
+    GAME_INVITE_TIMEOUT: float = 2.0
+    GAME_HISTORY_MAX_PENDING: int = 1000
+    GAME_HISTORY_BATCH_SIZE: int = 50
+    GAME_HISTORY_FLUSH_INTERVAL: float = 1.0
+    GAME_HISTORY_MAX_ATTEMPTS: int = 5
 
     @computed_field
     @property
@@ -36,13 +66,40 @@ class Settings(BaseSettings):
         )
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 180
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_USE_PROCESSES: bool = False
+
+    BACKPLANE: str = "local"
+    BACKPLANE_DIR: str = "/tmp/english-backplane"
+    BACKPLANE_TIMEOUT: float = 2.0
+
+    WS_SEND_QUEUE_SIZE: int = 64
+    WS_SLOW_CONSUMER_POLICY: str = "drop"
+
+    FRIEND_GRAPH_CACHE_SIZE: int = 10000
+    REQUEST_COUNTERS_CACHE_SIZE: int = 100000
+
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: Dict[str, float] = {"ws.answer": 0.01}
+
+    ADMIN_TOKEN: Optional[str] = None
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_INTERVAL: float = 0.1
+    LOOP_MONITOR_THRESHOLD: float = 0.1
+    LOOP_MONITOR_SAMPLES: int = 100
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
 
 
 settings = Settings()
 
 DATABASE_CONFIG = {
-    "connections": {"default": settings.POSTGRESQL_DATABASE_URI},
+    "connections": {
+        "default": settings.DATABASE_URI or settings.POSTGRESQL_DATABASE_URI
+    },
     "apps": {
         "models": {
             "models": ["app.models.models", "aerich.models"],
@@ -51,6 +108,103 @@ DATABASE_CONFIG = {
     },
 }
 
-CONNECTION_MANAGER = ConnectionManager()
+LOG_PIPELINE = LogPipeline(
+    level=settings.LOG_LEVEL,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+)
+
+METRICS = Metrics()
+
+BACKPLANE = create_backplane(
+    settings.BACKPLANE, settings.BACKPLANE_DIR, settings.BACKPLANE_TIMEOUT
+)
+
+CONNECTION_MANAGER = ConnectionManager(
+    backplane=BACKPLANE,
+    send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+    slow_consumer_policy=settings.WS_SLOW_CONSUMER_POLICY,
+    metrics=METRICS,
+)
+
+USER_CACHE = UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+USER_CACHE.attach(BACKPLANE)
+
+FRIEND_GRAPH = FriendGraph(maxsize=settings.FRIEND_GRAPH_CACHE_SIZE)
+FRIEND_GRAPH.attach(BACKPLANE)
+
+REQUEST_COUNTERS = RequestCounters(
+    maxsize=settings.REQUEST_COUNTERS_CACHE_SIZE,
+    connection_manager=CONNECTION_MANAGER,
+)
+
+USER_SEARCH = UserSearchIndex()
+USER_SEARCH.attach(BACKPLANE)
+
+LEADERBOARDS = Leaderboards(USER_SEARCH)
+LEADERBOARDS.attach(BACKPLANE)
+
+PASSWORD_HASHER = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
+
+WORD_CATALOG = WordCatalog(
+    words_in_one_unit=settings.WORDS_IN_ONE_UNIT,
+    units_in_one_book=settings.UNITS_IN_ONE_BOOK,
+)
+
+WORD_SAMPLER = WordSampler(WORD_CATALOG)
+
+WORD_SEARCH = WordSearchIndex()
+WORD_CATALOG.on_load(WORD_SEARCH.update)
+
+REVIEWS = ReviewScheduler(
+    WORD_CATALOG,
+    maxsize=settings.REVIEW_CACHE_SIZE,
+    batch_size=settings.REVIEW_BATCH_SIZE,
+    flush_interval=settings.REVIEW_FLUSH_INTERVAL,
+    max_attempts=settings.REVIEW_MAX_ATTEMPTS,
+    metrics=METRICS,
+)
+REVIEWS.attach(BACKPLANE)
+
+GAMES = create_game_registry(BACKPLANE)
+
+ROUND_SCHEDULER = RoundScheduler(metrics=METRICS)
+
+GAME_HISTORY = GameHistoryWriter(
+    max_pending=settings.GAME_HISTORY_MAX_PENDING,
+    batch_size=settings.GAME_HISTORY_BATCH_SIZE,
+    flush_interval=settings.GAME_HISTORY_FLUSH_INTERVAL,
+    max_attempts=settings.GAME_HISTORY_MAX_ATTEMPTS,
+    metrics=METRICS,
+)
+
+LOOP_MONITOR = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    threshold=settings.LOOP_MONITOR_THRESHOLD,
+    size=settings.LOOP_MONITOR_SAMPLES,
+    metrics=METRICS,
+)
 
-GAMES = {}
+METRICS.gauge(
+    "websocket_connections",
+    "Open WebSocket connections on this worker",
+    callback=lambda: len(CONNECTION_MANAGER.active_connections),
+)
+METRICS.gauge(
+    "active_games", "Game sessions hosted by this worker", callback=lambda: len(GAMES)
+)
+METRICS.add_stats("round_scheduler", ROUND_SCHEDULER.stats)
+METRICS.add_stats("ws_queue", CONNECTION_MANAGER.queue_stats)
+METRICS.add_stats("user_cache", USER_CACHE.stats)
+METRICS.add_stats("friend_graph", FRIEND_GRAPH.stats)
+METRICS.add_stats("password_hasher", PASSWORD_HASHER.stats)
+METRICS.add_stats("word_catalog", WORD_CATALOG.stats)
+METRICS.add_stats("word_search", WORD_SEARCH.stats)
+METRICS.add_stats("loop_monitor", LOOP_MONITOR.stats)
+METRICS.add_stats("logging", LOG_PIPELINE.stats)
+METRICS.add_stats("game_history", GAME_HISTORY.stats)
+METRICS.add_stats("reviews", REVIEWS.stats)
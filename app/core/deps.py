@@ -1,28 +1,44 @@
+import secrets
+
 from typing import Annotated, Optional
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
 
-from app.core.config import settings
+from app.core.config import USER_CACHE, settings
 from app.models.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+async def get_cached_user(username: str) -> Optional[User]:
+    user = USER_CACHE.get_user(username)
+    if user is None:
+        user = await User.get_or_none(username=username)
+        if user:
+            USER_CACHE.set_user(user)
+    return user
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     auth_exception = HTTPException(status_code=401, detail="Authentication is required")
 
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=settings.ALGORITHM)
-        username = payload.get("sub")
-        if not username:
-            raise auth_exception
-    except ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Invalid token")
-
-    user = await User.get_or_none(username=username)
+    username = USER_CACHE.get_token_subject(token)
+    if not username:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=settings.ALGORITHM
+            )
+            username = payload.get("sub")
+            if not username:
+                raise auth_exception
+        except ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except JWTError:
+            raise HTTPException(status_code=403, detail="Invalid token")
+        USER_CACHE.set_token_subject(token, username, payload.get("exp"))
+
+    user = await get_cached_user(username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -32,6 +48,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
 
 
+async def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+AdminDep = Depends(verify_admin_token)
+
+
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
@@ -71,7 +99,7 @@ async def get_current_user_from_ws_token(token: str) -> User:
     except JWTError:
         raise ValueError("Invalid token")
 
-    user = await User.get_or_none(username=username)
+    user = await get_cached_user(username)
     if not user:
         raise ValueError("User not found")
 
@@ -12,6 +12,16 @@ class GameStatus(str, Enum):
     finished = "finished"
 
 
+class Language(str, Enum):
+    en = "en"
+    uz = "uz"
+
+
+class LeaderboardType(str, Enum):
+    units = "units"
+    points = "points"
+
+
 class WSMessageTypes(str, Enum):
 
     # Friend
@@ -20,6 +30,7 @@ class WSMessageTypes(str, Enum):
     ACCEPT_REQUEST = "accept_request"
     REJECT_REQUEST = "reject_request"
     REQUEST_JOIN_GAME = 'request_join_game'
+    REQUESTS_COUNT = 'requests_count'
 
     # Game
     GAME_STARTED = 'game_started'
@@ -28,5 +39,6 @@ class WSMessageTypes(str, Enum):
     CORRECT_ANSWER = 'correct_answer'
     INCORRECT_ANSWER = 'incorrect_answer'
     JOIN_PLAYER = 'join_player'
+    LEADERBOARD_UPDATE = 'leaderboard_update'
     SEND_ANSWER = 'send_answer'
     END_GAME = 'end_game'
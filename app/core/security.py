@@ -1,7 +1,7 @@
 import bcrypt
 import datetime
 from jose import jwt
-from app.core.config import settings
+from app.core.config import PASSWORD_HASHER, settings
 from datetime import datetime as innerdatetime, timedelta
 
 
@@ -21,6 +21,16 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the password hasher pool."""
+    return await PASSWORD_HASHER.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify a password in the password hasher pool."""
+    return await PASSWORD_HASHER.run(verify_password, password, hashed)
+
+
 def create_access_token(
     data: dict,
     expires_delta: timedelta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
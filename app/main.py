@@ -1,13 +1,64 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from tortoise.contrib.fastapi import register_tortoise
+from tortoise import connections
+from tortoise.contrib.fastapi import RegisterTortoise
 
 from app.routers.main import router
-from app.core.config import DATABASE_CONFIG
+from app.core.config import (
+    CONNECTION_MANAGER,
+    DATABASE_CONFIG,
+    GAME_HISTORY,
+    LEADERBOARDS,
+    LOG_PIPELINE,
+    LOOP_MONITOR,
+    METRICS,
+    PASSWORD_HASHER,
+    REVIEWS,
+    ROUND_SCHEDULER,
+    USER_SEARCH,
+    WORD_CATALOG,
+    settings,
+)
+from app.services.codec import FastJSONResponse
+from app.services.metrics import MetricsMiddleware, instrument_db_client
+from app.services.password_hasher import PasswordHasherBusy
 
 
-app = FastAPI(openapi_version="3.1.0", redirect_slashes=True, root_path='/api')
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    LOG_PIPELINE.start()
+    async with RegisterTortoise(app, config=DATABASE_CONFIG, generate_schemas=True):
+        instrument_db_client(connections.get("default"))
+        if settings.LOOP_MONITOR_ENABLED:
+            await LOOP_MONITOR.start()
+        await CONNECTION_MANAGER.start()
+        await WORD_CATALOG.start(settings.WORD_CATALOG_REFRESH_INTERVAL)
+        await USER_SEARCH.load()
+        await LEADERBOARDS.load()
+        GAME_HISTORY.start()
+        REVIEWS.start()
+        yield
+        await LOOP_MONITOR.stop()
+        await WORD_CATALOG.stop()
+        ROUND_SCHEDULER.stop()
+        await GAME_HISTORY.stop()
+        await REVIEWS.stop()
+        await CONNECTION_MANAGER.stop()
+        PASSWORD_HASHER.shutdown()
+    LOG_PIPELINE.stop()
+
+
+app = FastAPI(
+    openapi_version="3.1.0",
+    redirect_slashes=True,
+    root_path='/api',
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 
 app.add_middleware(
@@ -17,7 +68,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, metrics=METRICS)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"message": "Server is busy, try again later"},
+    )
 
-register_tortoise(app, config=DATABASE_CONFIG, generate_schemas=True)
 
 app.include_router(router)
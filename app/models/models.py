@@ -40,3 +40,67 @@ class Friendship(models.Model):
 
     class Meta:
         unique_together = ("requester", "receiver")
+
+
+class Review(models.Model):
+    id = fields.BigIntField(pk=True)
+    user = fields.ForeignKeyField("models.User", related_name="reviews")
+    word_id = fields.BigIntField()
+    repetitions = fields.IntField(default=0)
+    interval = fields.IntField(default=0)
+    ease = fields.FloatField(default=2.5)
+    due_at = fields.DatetimeField()
+
+    class Meta:
+        table = "reviews"
+        unique_together = ("user", "word_id")
+
+
+class Game(models.Model):
+    id = fields.UUIDField(pk=True)
+    owner = fields.ForeignKeyField("models.User", related_name="owned_games")
+    words_count = fields.IntField()
+    players_count = fields.IntField()
+    round_duration = fields.IntField()
+    started_at = fields.DatetimeField()
+    finished_at = fields.DatetimeField()
+
+    class Meta:
+        table = "games"
+
+
+class GamePlayer(models.Model):
+    id = fields.BigIntField(pk=True)
+    game = fields.ForeignKeyField("models.Game", related_name="players")
+    user = fields.ForeignKeyField("models.User", related_name="game_results")
+    points = fields.IntField(default=0)
+    position = fields.IntField()
+
+    class Meta:
+        table = "game_players"
+
+
+class GameAnswer(models.Model):
+    id = fields.BigIntField(pk=True)
+    game = fields.ForeignKeyField("models.Game", related_name="answers")
+    user = fields.ForeignKeyField("models.User", related_name="game_answers")
+    round = fields.IntField()
+    word_id = fields.BigIntField(null=True)
+    correct = fields.BooleanField()
+    response_ms = fields.IntField()
+
+    class Meta:
+        table = "game_answers"
+
+
+class UserStats(models.Model):
+    user = fields.OneToOneField("models.User", related_name="stats", pk=True)
+    games_played = fields.IntField(default=0)
+    games_won = fields.IntField(default=0)
+    total_points = fields.BigIntField(default=0)
+    answers = fields.BigIntField(default=0)
+    correct_answers = fields.BigIntField(default=0)
+    total_response_ms = fields.BigIntField(default=0)
+
+    class Meta:
+        table = "user_stats"
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Query
+
+from app.core.config import LOOP_MONITOR
+from app.core.deps import AdminDep
+
+
+router = APIRouter(dependencies=[AdminDep])
+
+
+@router.get("/loop")
+async def get_loop_report(limit: int = Query(20, ge=1, le=1000)):
+    """
+    Event-loop lag statistics and the most recent stall samples.
+    """
+
+    return {
+        "enabled": LOOP_MONITOR.running,
+        "interval": LOOP_MONITOR.interval,
+        "threshold": LOOP_MONITOR.threshold,
+        **LOOP_MONITOR.stats(),
+        "samples": LOOP_MONITOR.recent(limit),
+    }
@@ -1,10 +1,20 @@
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 
+from app.core.config import (
+    FRIEND_GRAPH,
+    LEADERBOARDS,
+    REQUEST_COUNTERS,
+    USER_CACHE,
+    USER_SEARCH,
+)
 from app.core.deps import CurrentUserDep
-from app.core.enums import FriendshipStatus
-from app.models.models import Friendship, User
-from app.core.security import create_access_token, hash_password, verify_password
+from app.models.models import User
+from app.core.security import (
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+)
 from app.schemas.auth_schema import ChangeNameSchema, ChangePasswordSchema, LoginSchema, RegisterSchema
 
 
@@ -18,7 +28,7 @@ async def login(credentials: LoginSchema):
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND, content={"message": "User not found"}
         )
-    if not verify_password(credentials.password, user.password):
+    if not await verify_password_async(credentials.password, user.password):
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"message": "Invalid username or password"},
@@ -37,11 +47,13 @@ async def register(credentials: RegisterSchema):
             status_code=status.HTTP_406_NOT_ACCEPTABLE,
             content={"message": "User already exists"},
         )
-    await User.create(
+    user = await User.create(
         username=credentials.username,
-        password=hash_password(credentials.password),
+        password=await hash_password_async(credentials.password),
         name=credentials.name,
     )
+    USER_SEARCH.upsert(user.id, user.username, user.name)
+    LEADERBOARDS.add_user(user.id)
 
     return {
         "message": "User created successfully",
@@ -53,9 +65,7 @@ async def register(credentials: RegisterSchema):
 
 @router.get("/me", status_code=status.HTTP_200_OK)
 async def get_current_user(user: CurrentUserDep):
-    requests_count = await Friendship.filter(
-        receiver=user, status=FriendshipStatus.pending
-    ).count()
+    requests_count = await REQUEST_COUNTERS.get(user.id)
     return {
         "username": user.username,
         "name": user.name,
@@ -66,8 +76,9 @@ async def get_current_user(user: CurrentUserDep):
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(user: CurrentUserDep, credentials: ChangePasswordSchema):
-    user.password = hash_password(credentials.newPass)
-    await user.save()
+    user.password = await hash_password_async(credentials.newPass)
+    await user.save(update_fields=["password"])
+    USER_CACHE.invalidate_user(user.username)
     return {
         "message": "Succesfully changed",
     }
@@ -76,7 +87,10 @@ async def change_password(user: CurrentUserDep, credentials: ChangePasswordSchem
 @router.post("/change-name", status_code=status.HTTP_200_OK)
 async def change_name(user: CurrentUserDep, credentials: ChangeNameSchema):
     user.name = credentials.newName
-    await user.save()
+    await user.save(update_fields=["name"])
+    USER_CACHE.invalidate_user(user.username)
+    FRIEND_GRAPH.update_profile(user.id, user.username, user.name)
+    USER_SEARCH.upsert(user.id, user.username, user.name)
     return {
         "message": "Succesfully changed",
     }
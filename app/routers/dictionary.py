@@ -1,14 +1,28 @@
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter, Query, status
 
-from app.models.models import Word
-from app.core.config import settings
+from app.core.config import (
+    LEADERBOARDS,
+    REVIEWS,
+    USER_CACHE,
+    WORD_CATALOG,
+    WORD_SEARCH,
+    settings,
+)
 from app.core.deps import CurrentUserDep
+from app.core.enums import Language
+from app.models.models import User
+from app.schemas.dictionary_schema import ReviewAnswer
 
 
 router = APIRouter()
 
 
+def books_count() -> int:
+    """Books in the loaded dictionary; the setting until words are loaded."""
+    return WORD_CATALOG.books_count or settings.BOOKS_COUNT
+
+
 @router.get("/")
 async def get_dictionary():
     """
@@ -16,49 +30,108 @@ async def get_dictionary():
     """
 
     return {
-        "words_count": settings.WORDS_COUNT,
+        "words_count": len(WORD_CATALOG) or settings.WORDS_COUNT,
         "words_in_one_unit": settings.WORDS_IN_ONE_UNIT,
         "units_in_one_book": settings.UNITS_IN_ONE_BOOK,
-        "books_count": settings.BOOKS_COUNT,
+        "books_count": books_count(),
+    }
+
+
+@router.get("/search", status_code=status.HTTP_200_OK)
+async def search_words(
+    user: CurrentUserDep,
+    q: str = Query(..., min_length=1, max_length=100),
+    lang: Language = Query(Language.en),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Search words by their `lang` variants (en→uz or uz→en); the last word
+    of `q` matches as a prefix, for autocomplete.
+    """
+    return {
+        "lang": lang,
+        "words": WORD_SEARCH.search(q, lang.value, limit),
     }
 
 
 @router.get("/words", status_code=status.HTTP_200_OK)
 async def get_words(
     user: CurrentUserDep,
-    book: int = Query(1, ge=1, le=settings.BOOKS_COUNT),
+    book: int = Query(1, ge=1),
     unit: int = Query(1, ge=1, le=settings.UNITS_IN_ONE_BOOK),
 ):
     """
     Get words for a specific book and unit.
     """
-    offset = (book - 1) * settings.UNITS_IN_ONE_BOOK * settings.WORDS_IN_ONE_UNIT + (
-        unit - 1
-    ) * settings.WORDS_IN_ONE_UNIT
-    limit = settings.WORDS_IN_ONE_UNIT
-
-    words = await Word.all().offset(offset).limit(limit).values("data")
-
+    if book > books_count():
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"message": "Book not found"},
+        )
     return {
         "book": book,
         "unit": unit,
-        "words": words,
+        "words": WORD_CATALOG.get_unit(book, unit),
     }
 
 
 @router.post("/complete-unit", status_code=status.HTTP_200_OK)
 async def mark_completed_unit(
     user: CurrentUserDep,
-    book: int = Query(1, ge=1, le=settings.BOOKS_COUNT),
+    book: int = Query(1, ge=1),
     unit: int = Query(1, ge=1, le=settings.UNITS_IN_ONE_BOOK),
 ):
+    if book > books_count():
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"message": "Book not found"},
+        )
     absolute_unit = (book - 1) * settings.UNITS_IN_ONE_BOOK + unit
-    if user.completed_unit >= absolute_unit:
+    # Compare against the database rather than the cached user, which may
+    # be stale when another worker changed it.
+    updated = await User.filter(
+        id=user.id, completed_unit__lt=absolute_unit
+    ).update(completed_unit=absolute_unit)
+    if not updated:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"message": "You have already completed this unit."},
         )
     user.completed_unit = absolute_unit
-    await user.save()
+    USER_CACHE.invalidate_user(user.username)
+    LEADERBOARDS.set_completed_unit(user.id, absolute_unit)
 
     return JSONResponse(status_code=status.HTTP_200_OK, content="Succesful")
+
+
+@router.get("/review", status_code=status.HTTP_200_OK)
+async def get_review_words(
+    user: CurrentUserDep,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Next words to review: due reviews first, then unseen words from
+    completed units.
+    """
+    return {
+        "words": await REVIEWS.next_words(user.id, user.completed_unit, limit),
+    }
+
+
+@router.post("/review", status_code=status.HTTP_200_OK)
+async def review_word(user: CurrentUserDep, answer: ReviewAnswer):
+    """
+    Record how well a word was recalled (0-5) and schedule its next review.
+    """
+    if WORD_CATALOG.index_of(answer.word_id) is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"message": "Word not found"},
+        )
+    state = await REVIEWS.record(user.id, answer.word_id, answer.quality)
+    return {
+        "word_id": answer.word_id,
+        "interval": state.interval,
+        "ease": state.ease,
+        "due_at": state.due,
+    }
@@ -4,7 +4,12 @@ from fastapi.responses import JSONResponse
 
 from app.core.deps import CurrentUserDep
 from app.models.models import Friendship, User
-from app.core.config import CONNECTION_MANAGER
+from app.core.config import (
+    CONNECTION_MANAGER,
+    FRIEND_GRAPH,
+    REQUEST_COUNTERS,
+    USER_SEARCH,
+)
 from app.core.enums import FriendshipStatus, WSMessageTypes
 
 from tortoise.expressions import Q
@@ -17,43 +22,17 @@ router = APIRouter()
 
 @router.get("/all", response_model=List[OutPutUser])
 async def get_friends(user: CurrentUserDep):
-    friendships = (
-        await Friendship.filter(
-            Q(requester=user) | Q(receiver=user), status=FriendshipStatus.accepted
-        )
-        .prefetch_related("requester", "receiver")
-        .all()
-    )
-
-    friends = []
-    for friendship in friendships:
-        if friendship.requester_id == user.id:
-            friends.append(friendship.receiver)
-        else:
-            friends.append(friendship.requester)
-    return friends
+    return await FRIEND_GRAPH.friends(user.id)
 
 
 @router.get("/requests", response_model=List[OutPutRequest])
 async def get_friends_requests(user: CurrentUserDep):
-    requests = (
-        await Friendship.filter(receiver=user, status=FriendshipStatus.pending)
-        .prefetch_related("requester")
-        .all()
-    )
-
-    return requests
+    return await FRIEND_GRAPH.incoming_requests(user.id)
 
 
 @router.get("/my-requests", response_model=List[OutPutMyRequest])
 async def get_friends_requests(user: CurrentUserDep):
-    myrequests = (
-        await Friendship.filter(requester=user, status=FriendshipStatus.pending)
-        .prefetch_related("receiver")
-        .all()
-    )
-
-    return myrequests
+    return await FRIEND_GRAPH.outgoing_requests(user.id)
 
 
 @router.post("/send-request")
@@ -64,12 +43,8 @@ async def send_friend_request(user: CurrentUserDep, user_id: int = Query(...)):
             content={"error": "You cannot send a friend request to yourself."},
         )
 
-    existing_request = await Friendship.filter(
-        (Q(requester=user) & Q(receiver_id=user_id))
-        | (Q(requester_id=user_id) & Q(receiver=user))
-    ).first()
-
-    if existing_request:
+    related_ids = await FRIEND_GRAPH.related_ids(user.id)
+    if user_id in related_ids:
         return JSONResponse(
             status_code=400, content={"error": "Friend request already exists."}
         )
@@ -78,13 +53,15 @@ async def send_friend_request(user: CurrentUserDep, user_id: int = Query(...)):
     if not receiver:
         return JSONResponse(status_code=404, content={"error": "User not found."})
 
-    await Friendship.create(
+    friendship = await Friendship.create(
         requester=user, receiver=receiver, status=FriendshipStatus.pending
     )
+    FRIEND_GRAPH.add_request(friendship.id, user, receiver)
 
     await CONNECTION_MANAGER.send_message(
         receiver.username, type=WSMessageTypes.RECEIVE_FRIENDSHIP_REQUEST, data={}
     )
+    await REQUEST_COUNTERS.change(receiver.id, receiver.username, 1)
 
     return JSONResponse(status_code=201, content="OK")
 
@@ -102,9 +79,11 @@ async def cancel_friend_request(user: CurrentUserDep, request_id: int = Query(..
 
     receiver: User = await friendship.receiver
     await friendship.delete()
+    FRIEND_GRAPH.remove(friendship.id, friendship.requester_id, receiver.id)
     await CONNECTION_MANAGER.send_message(
         receiver.username, type=WSMessageTypes.USER_CANCEL_REQUEST
     )
+    await REQUEST_COUNTERS.change(receiver.id, receiver.username, -1)
     return JSONResponse(status_code=200, content="OK")
 
 
@@ -130,6 +109,8 @@ async def accept_friend_request(user: CurrentUserDep, request_id: int = Query(..
         }
     )
     await friendship.save()
+    FRIEND_GRAPH.accept(friendship.id, friendship.requester_id, user.id)
+    await REQUEST_COUNTERS.change(user.id, user.username, -1)
     return JSONResponse(status_code=200, content="OK")
 
 
@@ -145,6 +126,8 @@ async def reject_friend_request(user: CurrentUserDep, request_id: int = Query(..
         )
 
     await friendship.delete()
+    FRIEND_GRAPH.remove(friendship.id, friendship.requester_id, user.id)
+    await REQUEST_COUNTERS.change(user.id, user.username, -1)
     receiver: User = await friendship.receiver
     await CONNECTION_MANAGER.send_message(
         receiver.username, type=WSMessageTypes.REJECT_REQUEST, data={
@@ -173,6 +156,7 @@ async def unfriend(user: CurrentUserDep, user_id: int = Query()):
         return JSONResponse(status_code=404, content={"error": "Friendship not found."})
 
     await friendship.delete()
+    FRIEND_GRAPH.remove(friendship.id, friendship.requester_id, friendship.receiver_id)
     return JSONResponse(
         status_code=200,
         content="OK"
@@ -181,19 +165,7 @@ async def unfriend(user: CurrentUserDep, user_id: int = Query()):
 
 @router.get("/search", response_model=List[OutPutUser])
 async def search_friends(user: CurrentUserDep, query: str = Query(...)):
-    friendship_users = await Friendship.filter(
-        Q(requester_id=user.id) | Q(receiver_id=user.id)
-    ).values_list("requester_id", "receiver_id")
-
-    related_ids = set()
-    for requester_id, receiver_id in friendship_users:
-        related_ids.add(requester_id)
-        related_ids.add(receiver_id)
-
+    related_ids = await FRIEND_GRAPH.related_ids(user.id)
     related_ids.add(user.id)
 
-    users = await User.filter(
-        username__icontains=query
-    ).exclude(id__in=related_ids).limit(10)
-
-    return users
+    return USER_SEARCH.search(query, exclude=related_ids, limit=10)
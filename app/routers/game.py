@@ -1,10 +1,10 @@
 from fastapi import Query, status, APIRouter
 from fastapi.responses import JSONResponse
 
-from app.core.config import CONNECTION_MANAGER, GAMES, settings
+from app.core.config import CONNECTION_MANAGER, GAMES, WORD_SAMPLER, settings
 from app.core.deps import CurrentUserDep
 from app.core.enums import WSMessageTypes
-from app.models.models import User, Word
+from app.models.models import User
 from app.schemas.game_schema import InputUsers
 from app.services.game_manager import GameSession
 
@@ -14,7 +14,7 @@ router = APIRouter()
 
 @router.post("/create")
 async def create_game(user: CurrentUserDep, credentials: InputUsers):
-    has_game = GAMES.get(user.username)
+    has_game = await GAMES.exists(user.username)
     if has_game:
         return JSONResponse(
             status_code=400, content={"message": "Siz allaqachon o'yin yaratgansiz"}
@@ -29,30 +29,34 @@ async def create_game(user: CurrentUserDep, credentials: InputUsers):
             "status": True
         }
     ]
+    friends = {
+        friend["username"]: friend
+        for friend in await User.filter(username__in=credentials.users).values(
+            "id", "name", "username"
+        )
+    }
+    invited = [
+        username for username in dict.fromkeys(credentials.users) if username in friends
+    ]
+    statuses = await CONNECTION_MANAGER.broadcast(
+        invited,
+        type=WSMessageTypes.REQUEST_JOIN_GAME,
+        data={
+            "user": {
+                "name": user.name,
+                "username": user.username
+            }
+        },
+        timeout=settings.GAME_INVITE_TIMEOUT,
+    )
     status_count = 0
-    for friend in credentials.users:
-        friend_data = await User.filter(username=friend).first()
-        if friend_data:
-            user_status = await CONNECTION_MANAGER.send_message(
-                friend,
-                type=WSMessageTypes.REQUEST_JOIN_GAME,
-                data={
-                    "user": {
-                        "name": user.name,
-                        "username": user.username
-                    }
-                }
-            )
-            users_status.append({
-                "user": {
-                    "id": friend_data.id,
-                    "name": friend_data.name,
-                    "username": friend_data.username
-                },
-                "status": user_status
-            })
-            if user_status:
-                status_count += 1
+    for username in invited:
+        users_status.append({
+            "user": friends[username],
+            "status": statuses[username]
+        })
+        if statuses[username]:
+            status_count += 1
     if status_count < 1:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,13 +64,27 @@ async def create_game(user: CurrentUserDep, credentials: InputUsers):
                 "message": "Online do'stlaringiz yo'q"
             }
         )
-    words = await Word.raw(f"SELECT * FROM words ORDER BY RANDOM() LIMIT {settings.ROUND_WORDS_COUNT}")
-    GAMES[user.username] = GameSession(
-        owner=user,
-        owner_ws=CONNECTION_MANAGER.active_connections[user.username],
+    last_unit = None
+    if credentials.only_completed and user.completed_unit > 0:
+        last_unit = user.completed_unit
+    word_ids, words = WORD_SAMPLER.sample_with_ids(
+        settings.ROUND_WORDS_COUNT, last_unit=last_unit
+    )
+    game_session = GameSession(
+        owner={
+            "id": user.id,
+            "name": user.name,
+            "username": user.username
+        },
         words=words,
-        round_duration=settings.ROUND_DURATION
+        round_duration=settings.ROUND_DURATION,
+        answer_max_typos=settings.ANSWER_MAX_TYPOS,
+        word_ids=word_ids,
     )
+    if not await GAMES.create(user.username, game_session):
+        return JSONResponse(
+            status_code=400, content={"message": "Siz allaqachon o'yin yaratgansiz"}
+        )
     return JSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
@@ -87,49 +105,40 @@ async def join_game(user: CurrentUserDep, username: str = Query(..., alias="game
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST, content={"message": "You are creator that game"}
         )
-    game_session: GameSession = GAMES.get(username, None)
-    if game_session:
-        if game_session.started:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content='Game already started'
-            )
-        game_session.players.append({
-            "user": user,
-            "point": 0,
-            "ws": CONNECTION_MANAGER.active_connections[user.username]
-        })
-        users_status = []
-        for player in game_session.players:
-            user_status = await CONNECTION_MANAGER.send_message(
-                player["user"].username,
-                type=WSMessageTypes.JOIN_PLAYER,
-                data={
-                    "user": {
-                        "id": user.id,
-                        "name": user.name,
-                        "username": user.username
-                    }
-                }
-            )
-            users_status.append({
+    result = await GAMES.join(
+        username, {"id": user.id, "name": user.name, "username": user.username}
+    )
+    if result["status"] == "started":
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content='Game already started'
+        )
+    if result["status"] == "ok":
+        statuses = await CONNECTION_MANAGER.broadcast(
+            [player["username"] for player in result["players"]],
+            type=WSMessageTypes.JOIN_PLAYER,
+            data={
                 "user": {
-                    "id": player['user'].id,
-                    "name": player['user'].name,
-                    "username": player['user'].username
-                },
-                "status": user_status
-            })
+                    "id": user.id,
+                    "name": user.name,
+                    "username": user.username
+                }
+            },
+            timeout=settings.GAME_INVITE_TIMEOUT,
+        )
+        users_status = [
+            {
+                "user": player,
+                "status": statuses[player["username"]]
+            }
+            for player in result["players"]
+        ]
         
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "O'yinga qo'shildingiz",
-                "game": {
-                    "owner": game_session.owner.username,
-                    "words_len": len(game_session.words),
-                    "round_duration": game_session.round_duration
-                },
+                "game": result["game"],
                 "users_status": users_status
             }
         )
@@ -144,30 +153,28 @@ async def join_game(user: CurrentUserDep, username: str = Query(..., alias="game
 async def start_game(
     user: CurrentUserDep
 ):
-    game_session: GameSession = GAMES.get(user.username, None)
-    if game_session:
-        if game_session.started:
-            return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    content='GameSession already started'
-                )
-        is_started = await game_session.start_game()
-        if is_started:
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content={
-                    "message": "Game started"
-                }
-            )
-        else:
-            return JSONResponse(
+    result = await GAMES.start(user.username)
+    if result["status"] == "not_found":
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content='GameSession not found'
+        )
+    if result["status"] == "started":
+        return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "message": "Game not started"
-                }
+                content='GameSession already started'
             )
+    if result["status"] == "ok":
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "message": "Game started"
+            }
+        )
     else:
         return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content='GameSession not found'
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "message": "Game not started"
+            }
         )
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Query
+
+from app.core.config import FRIEND_GRAPH, LEADERBOARDS
+from app.core.deps import CurrentUserDep
+from app.core.enums import LeaderboardType
+
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_leaderboard(
+    user: CurrentUserDep,
+    board: LeaderboardType = Query(LeaderboardType.units),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Global ranking by completed unit or game points, plus the caller's own
+    standing.
+    """
+
+    return {
+        "board": board,
+        **LEADERBOARDS.page(board, offset, limit),
+        "me": LEADERBOARDS.standing(board, user.id),
+    }
+
+
+@router.get("/friends")
+async def get_friends_leaderboard(
+    user: CurrentUserDep,
+    board: LeaderboardType = Query(LeaderboardType.units),
+):
+    """
+    Ranking of the caller and their friends.
+    """
+
+    adjacency = await FRIEND_GRAPH.get(user.id)
+    return {
+        "board": board,
+        "items": LEADERBOARDS.among(board, [user.id, *adjacency.friends]),
+    }
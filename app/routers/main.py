@@ -1,6 +1,15 @@
 from fastapi import APIRouter
 
-from app.routers import auth, dictionary, friends, game, websocket
+from app.routers import (
+    admin,
+    auth,
+    dictionary,
+    friends,
+    game,
+    leaderboard,
+    metrics,
+    websocket,
+)
 
 
 router = APIRouter()
@@ -9,4 +18,9 @@ router.include_router(auth.router, prefix="/auth", tags=["Authorization"])
 router.include_router(dictionary.router, prefix="/dict", tags=["Dictionary"])
 router.include_router(friends.router, prefix="/friends", tags=["Friends"])
 router.include_router(game.router, prefix="/game", tags=["Game"])
+router.include_router(
+    leaderboard.router, prefix="/leaderboard", tags=["Leaderboard"]
+)
 router.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
+router.include_router(metrics.router, tags=["Metrics"])
+router.include_router(admin.router, prefix="/admin", tags=["Admin"])
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Query, WebSocket
+import logging
+import time
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
 from app.core.enums import WSMessageTypes
-from app.core.config import CONNECTION_MANAGER, GAMES
+from app.core.config import CONNECTION_MANAGER, GAMES, METRICS
 from app.core.deps import get_current_user_from_ws_token
-from app.services.game_manager import GameSession
+from app.services.codec import negotiate, receive
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MESSAGE_TYPES = {type.value for type in WSMessageTypes}
+
 
 @router.websocket("/")
 async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
@@ -19,22 +26,40 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
         await websocket.close(code=1008)
         return
 
-    await CONNECTION_MANAGER.connect(user.username, websocket)
+    codec = negotiate(websocket.scope.get("subprotocols", []))
+    await CONNECTION_MANAGER.connect(user.username, websocket, codec)
     try:
         while True:
-            data = await websocket.receive_json()
-            if data['type'] == WSMessageTypes.SEND_ANSWER:
+            data = await receive(websocket, codec)
+            type = data.get('type')
+            METRICS.ws_messages_in.inc(type if type in MESSAGE_TYPES else 'unknown')
+            if type == WSMessageTypes.SEND_ANSWER:
+                started = time.perf_counter()
                 try :
-                    game_session: GameSession = GAMES.get(data['data']['game_username'])
-                    if game_session:
-                        await game_session.submit_answer(
-                            websocket,
-                            user.username,
-                            data['data']['answer']
-                        )
+                    game_id = data['data']['game_username']
+                    await GAMES.submit_answer(
+                        game_id,
+                        user.username,
+                        data['data']['answer']
+                    )
                 except:
-                    pass
-    except Exception as e:
-        print(f"Error: {e}")
+                    continue
+                logger.info(
+                    "Answer submitted",
+                    extra={
+                        "event": "ws.answer",
+                        "user": user.username,
+                        "game_id": game_id,
+                        "type": type,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+                    },
+                )
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception(
+            "WebSocket handler failed",
+            extra={"event": "ws.error", "user": user.username},
+        )
     finally:
-        CONNECTION_MANAGER.disconnect(user.username)
+        CONNECTION_MANAGER.disconnect(user.username, websocket)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class ReviewAnswer(BaseModel):
+    word_id: int
+    quality: int = Field(ge=0, le=5)
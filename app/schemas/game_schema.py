@@ -4,3 +4,4 @@ from pydantic import BaseModel
 
 class InputUsers(BaseModel):
     users: List
+    only_completed: bool = False
@@ -0,0 +1,91 @@
+import unicodedata
+from typing import Iterable
+
+LEADING_WORDS = ("a ", "an ", "the ", "to ")
+KEPT_PUNCTUATION = "'-"
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Casefold, unify Unicode forms, drop punctuation, collapse whitespace
+    and strip a leading article ("a", "an", "the") or infinitive "to".
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("’", "'")
+    text = "".join(
+        " "
+        if unicodedata.category(char).startswith("P") and char not in KEPT_PUNCTUATION
+        else char
+        for char in text
+    )
+    text = " ".join(text.split())
+    for leading in LEADING_WORDS:
+        if text.startswith(leading):
+            return text[len(leading):]
+    return text
+
+
+def within_distance(source: str, target: str, max_distance: int) -> bool:
+    """
+    Levenshtein distance check limited to a diagonal band of width
+    `max_distance`, bailing out as soon as a row exceeds the bound.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return False
+    limit = max_distance + 1
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [limit] * (len(target) + 1)
+        current[0] = i
+        row_min = i
+        first = max(1, i - max_distance)
+        last = min(len(target), i + max_distance)
+        for j in range(first, last + 1):
+            cost = previous[j - 1] + (source_char != target[j - 1])
+            cost = min(cost, previous[j] + 1, current[j - 1] + 1)
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+class AnswerMatcher:
+    """
+    Precomputed set of normalized answer variants for one word.
+
+    Exact matches are a single hash lookup; with `max_distance > 0` variants
+    of at least `min_fuzzy_length` characters also accept small typos.
+    """
+
+    __slots__ = ("variants", "max_distance", "fuzzy_variants")
+
+    def __init__(
+        self,
+        variants: Iterable[str],
+        max_distance: int = 0,
+        min_fuzzy_length: int = 4,
+    ):
+        self.variants = frozenset(
+            normalized for normalized in map(normalize_answer, variants) if normalized
+        )
+        self.max_distance = max_distance
+        self.fuzzy_variants = (
+            tuple(
+                variant
+                for variant in self.variants
+                if len(variant) >= min_fuzzy_length
+            )
+            if max_distance > 0
+            else ()
+        )
+
+    def matches(self, answer: str) -> bool:
+        normalized = normalize_answer(answer)
+        if normalized in self.variants:
+            return True
+        for variant in self.fuzzy_variants:
+            if within_distance(normalized, variant, self.max_distance):
+                return True
+        return False
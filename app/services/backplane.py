@@ -0,0 +1,309 @@
+import asyncio
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+Handler = Callable[[Dict], Awaitable[Any]]
+
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+PRESENCE = "presence"
+
+
+class BackplaneError(Exception):
+    pass
+
+
+class InProcessBackplane:
+    """
+    Backplane for a single worker process.
+
+    Claims live in a local dict and requests are always dispatched locally,
+    since every user and game belongs to this process.
+    """
+
+    def __init__(self):
+        self.worker_id = str(os.getpid())
+        self.handlers: Dict[str, Handler] = {}
+        self.claims: Dict[tuple, str] = {}
+
+    def add_handler(self, kind: str, handler: Handler):
+        self.handlers[kind] = handler
+
+    async def start(self):
+        self.worker_id = str(os.getpid())
+
+    async def stop(self):
+        pass
+
+    def claim(self, namespace: str, key: str, replace: bool = False) -> bool:
+        if not replace and (namespace, key) in self.claims:
+            return False
+        self.claims[(namespace, key)] = self.worker_id
+        return True
+
+    def release(self, namespace: str, key: str):
+        self.claims.pop((namespace, key), None)
+
+    def owner(self, namespace: str, key: str) -> Optional[str]:
+        return self.claims.get((namespace, key))
+
+    def set_presence(self, username: str):
+        self.claim(PRESENCE, username, replace=True)
+
+    def clear_presence(self, username: str):
+        self.release(PRESENCE, username)
+
+    def locate(self, username: str) -> Optional[str]:
+        return self.owner(PRESENCE, username)
+
+    async def request(self, worker_id: str, kind: str, payload: Dict) -> Any:
+        if worker_id != self.worker_id:
+            raise BackplaneError(f"Unknown worker {worker_id}")
+        return await self.dispatch(kind, payload)
+
+    def broadcast(self, kind: str, payload: Dict):
+        pass
+
+    async def dispatch(self, kind: str, payload: Dict) -> Any:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            raise BackplaneError(f"No handler for {kind}")
+        return await handler(payload)
+
+
+class _Peer:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count()
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def closed(self) -> bool:
+        return self.reader_task.done()
+
+    async def request(self, kind: str, payload: Dict) -> Any:
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await self.send(kind, payload, request_id)
+            return await future
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def send(self, kind: str, payload: Dict, request_id: Optional[int] = None):
+        frame = {"id": request_id, "kind": kind, "payload": payload}
+        self.writer.write(json.dumps(frame).encode() + b"\n")
+        await self.writer.drain()
+
+    def close(self):
+        self.reader_task.cancel()
+        self.writer.close()
+
+    async def _read_loop(self):
+        try:
+            while line := await self.reader.readline():
+                frame = json.loads(line)
+                future = self.pending.get(frame["id"])
+                if future is None or future.done():
+                    continue
+                if "error" in frame:
+                    future.set_exception(BackplaneError(frame["error"]))
+                else:
+                    future.set_result(frame.get("result"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(BackplaneError("Connection closed"))
+            self.writer.close()
+
+
+class UnixSocketBackplane(InProcessBackplane):
+    """
+    Backplane for several worker processes on one host.
+
+    Each worker listens on `<directory>/workers/<pid>.sock`. A claim (user
+    presence, game ownership) is a file `<directory>/<namespace>/<key>`
+    holding the owning worker id; claims of workers whose socket is gone are
+    treated as free. Frames are newline-delimited JSON.
+    """
+
+    def __init__(self, directory: str, timeout: float = 2.0):
+        super().__init__()
+        self.directory = Path(directory)
+        self.workers_dir = self.directory / "workers"
+        self.timeout = timeout
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.peers: Dict[str, _Peer] = {}
+        self.clients = set()
+        self.background = set()
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def socket_path(self) -> Path:
+        return self._worker_socket(self.worker_id)
+
+    async def start(self):
+        await super().start()
+        self.workers_dir.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self.server = await asyncio.start_unix_server(
+            self._serve, path=str(self.socket_path), limit=MAX_FRAME_SIZE
+        )
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            for writer in self.clients:
+                writer.close()
+            await self.server.wait_closed()
+            self.server = None
+        for peer in self.peers.values():
+            peer.close()
+        self.peers.clear()
+        self.socket_path.unlink(missing_ok=True)
+
+    def claim(self, namespace: str, key: str, replace: bool = False) -> bool:
+        path = self._claim_path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{self.worker_id}.tmp")
+        tmp_path.write_text(self.worker_id)
+        if replace:
+            os.replace(tmp_path, path)
+            return True
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, path)
+                    return True
+                except FileExistsError:
+                    if self.owner(namespace, key) is not None:
+                        return False
+            return False
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def release(self, namespace: str, key: str):
+        path = self._claim_path(namespace, key)
+        try:
+            if path.read_text() == self.worker_id:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def owner(self, namespace: str, key: str) -> Optional[str]:
+        path = self._claim_path(namespace, key)
+        try:
+            worker_id = path.read_text()
+        except FileNotFoundError:
+            return None
+        if not self._worker_socket(worker_id).exists():
+            path.unlink(missing_ok=True)
+            return None
+        return worker_id
+
+    async def request(self, worker_id: str, kind: str, payload: Dict) -> Any:
+        if worker_id == self.worker_id:
+            return await self.dispatch(kind, payload)
+        peer = await self._get_peer(worker_id)
+        try:
+            return await asyncio.wait_for(peer.request(kind, payload), self.timeout)
+        except asyncio.TimeoutError:
+            raise BackplaneError(f"Worker {worker_id} timed out")
+        except OSError as exc:
+            self._drop_peer(worker_id)
+            raise BackplaneError(str(exc))
+
+    def broadcast(self, kind: str, payload: Dict):
+        for path in self.workers_dir.glob("*.sock"):
+            if path.stem == self.worker_id:
+                continue
+            task = asyncio.create_task(self._notify(path.stem, kind, payload))
+            self.background.add(task)
+            task.add_done_callback(self.background.discard)
+
+    async def _notify(self, worker_id: str, kind: str, payload: Dict):
+        try:
+            peer = await self._get_peer(worker_id)
+            await peer.send(kind, payload)
+        except (OSError, BackplaneError):
+            self._drop_peer(worker_id)
+
+    async def _get_peer(self, worker_id: str) -> _Peer:
+        async with self._connect_lock:
+            peer = self.peers.get(worker_id)
+            if peer is not None and not peer.closed:
+                return peer
+            path = self._worker_socket(worker_id)
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(str(path), limit=MAX_FRAME_SIZE),
+                    self.timeout,
+                )
+            except (OSError, asyncio.TimeoutError) as exc:
+                if isinstance(exc, ConnectionRefusedError):
+                    path.unlink(missing_ok=True)
+                raise BackplaneError(f"Worker {worker_id} is unreachable") from exc
+            peer = _Peer(reader, writer)
+            self.peers[worker_id] = peer
+            return peer
+
+    def _drop_peer(self, worker_id: str):
+        peer = self.peers.pop(worker_id, None)
+        if peer:
+            peer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self.clients.add(writer)
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(
+                    self._handle_frame(json.loads(line), writer, write_lock)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _handle_frame(
+        self, frame: Dict, writer: asyncio.StreamWriter, write_lock: asyncio.Lock
+    ):
+        try:
+            response = {
+                "id": frame["id"],
+                "result": await self.dispatch(frame["kind"], frame["payload"]),
+            }
+        except Exception as exc:
+            response = {"id": frame["id"], "error": str(exc)}
+        if frame["id"] is None:
+            return
+        try:
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except OSError:
+            pass
+
+    def _worker_socket(self, worker_id: str) -> Path:
+        return self.workers_dir / f"{worker_id}.sock"
+
+    def _claim_path(self, namespace: str, key: str) -> Path:
+        return self.directory / namespace / key.encode().hex()
+
+
+def create_backplane(kind: str, directory: str, timeout: float) -> InProcessBackplane:
+    if kind == "unix":
+        return UnixSocketBackplane(directory, timeout=timeout)
+    return InProcessBackplane()
@@ -0,0 +1,124 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _default(value):
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """UTF-8 JSON, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode()
+
+
+def loads(raw: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class JSONCodec:
+    name = "json"
+    subprotocol: Optional[str] = None
+    binary = False
+
+    def encode(self, message: Dict) -> str:
+        return dumps(message).decode()
+
+    def decode(self, raw: Union[str, bytes]) -> Dict:
+        return loads(raw)
+
+
+class MsgPackCodec:
+    name = "msgpack"
+    subprotocol = "msgpack"
+    binary = True
+
+    def encode(self, message: Dict) -> bytes:
+        return msgpack.packb(message, default=_default)
+
+    def decode(self, raw: Union[str, bytes]) -> Dict:
+        if isinstance(raw, str):
+            return loads(raw)
+        return msgpack.unpackb(raw)
+
+
+JSON_CODEC = JSONCodec()
+MSGPACK_CODEC = MsgPackCodec() if msgpack is not None else None
+
+
+def negotiate(subprotocols: Iterable[str]):
+    """
+    Pick the WebSocket codec from the client's `Sec-WebSocket-Protocol`
+    offer. JSON is the default and the only option without msgpack.
+    """
+    if MSGPACK_CODEC is not None and MSGPACK_CODEC.subprotocol in subprotocols:
+        return MSGPACK_CODEC
+    return JSON_CODEC
+
+
+async def receive(websocket: WebSocket, codec) -> Dict:
+    """`receive_json` that accepts the codec's frames (text or binary)."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    raw = message.get("bytes")
+    if raw is None:
+        raw = message.get("text")
+    if raw is None:
+        raise WebSocketDisconnect(1003)
+    return codec.decode(raw)
+
+
+class EncodedMessage:
+    """
+    A WebSocket message encoded at most once per codec, so a broadcast to
+    mixed JSON and msgpack clients pays for each encoding once.
+    """
+
+    __slots__ = ("type", "data", "frames")
+
+    def __init__(
+        self, type: str, data: Optional[Dict] = None, json_frame: Optional[str] = None
+    ):
+        self.type = getattr(type, "value", type)
+        self.data = data
+        self.frames = {}
+        if json_frame is not None:
+            self.frames[JSON_CODEC.name] = json_frame
+
+    def frame(self, codec=JSON_CODEC) -> Union[str, bytes]:
+        frame = self.frames.get(codec.name)
+        if frame is None:
+            if self.data is None:
+                message = JSON_CODEC.decode(self.frames[JSON_CODEC.name])
+            else:
+                message = {"type": self.type, "data": self.data}
+            frame = self.frames[codec.name] = codec.encode(message)
+        return frame
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through `dumps` (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
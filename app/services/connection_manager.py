@@ -1,27 +1,159 @@
-from typing import Dict
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
 from fastapi import WebSocket
 
+from app.services.backplane import BackplaneError, InProcessBackplane
+from app.services.codec import JSON_CODEC, EncodedMessage
+from app.services.metrics import Metrics
+from app.services.outbox import DROP, Outbox
+
+logger = logging.getLogger(__name__)
+
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        backplane: Optional[InProcessBackplane] = None,
+        send_queue_size: int = 64,
+        slow_consumer_policy: str = DROP,
+        metrics: Optional[Metrics] = None,
+    ):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.outboxes: Dict[str, Outbox] = {}
+        self.send_queue_size = send_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.dropped = 0
+        self.metrics = metrics or Metrics()
+        self.backplane = backplane or InProcessBackplane()
+        self.backplane.add_handler("send_frame", self._handle_remote_frame)
+
+    async def start(self):
+        await self.backplane.start()
 
-    async def connect(self, username: str, websocket: WebSocket):
-        await websocket.accept()
+    async def stop(self):
+        await self.backplane.stop()
+
+    async def connect(self, username: str, websocket: WebSocket, codec=JSON_CODEC):
+        await websocket.accept(subprotocol=codec.subprotocol)
+        self._close_outbox(username)
         self.active_connections[username] = websocket
-        print(f"User {username} connected.")
+        self.outboxes[username] = Outbox(
+            websocket, self.send_queue_size, self.slow_consumer_policy, codec
+        )
+        self.backplane.set_presence(username)
+        logger.info(
+            "WebSocket connected",
+            extra={"event": "ws.connect", "user": username, "codec": codec.name},
+        )
 
-    def disconnect(self, username: str):
+    def disconnect(self, username: str, websocket: Optional[WebSocket] = None):
+        current = self.active_connections.get(username)
+        if websocket is not None and current is not websocket:
+            return
         self.active_connections.pop(username, None)
-        print(f"User {username} disconnected.")
+        self._close_outbox(username)
+        self.backplane.clear_presence(username)
+        logger.info(
+            "WebSocket disconnected",
+            extra={"event": "ws.disconnect", "user": username},
+        )
 
     async def send_message(self, username: str, type: str, data: Dict = {}):
-        ws = self.active_connections.get(username)
-        if ws:
-            try:
-                await ws.send_json(
-                    {"type": type, "data": data}
+        statuses = await self.send_frame([username], EncodedMessage(type, data))
+        return statuses[username]
+
+    async def broadcast(
+        self,
+        usernames: Iterable[str],
+        type: str,
+        data: Dict = {},
+        timeout: Optional[float] = None,
+    ) -> Dict[str, bool]:
+        return await self.send_frame(
+            usernames, EncodedMessage(type, data), timeout=timeout
+        )
+
+    async def send_frame(
+        self,
+        usernames: Iterable[str],
+        message: EncodedMessage,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, bool]:
+        statuses = {}
+        remote: Dict[str, List[str]] = defaultdict(list)
+        for username in usernames:
+            outbox = self.outboxes.get(username)
+            if outbox is not None:
+                statuses[username] = outbox.put(
+                    message.type, message.frame(outbox.codec)
                 )
-                return True
-            except:
-                return False
+                self.metrics.ws_messages_out.inc(message.type)
+                continue
+            worker_id = self.backplane.locate(username)
+            if worker_id and worker_id != self.backplane.worker_id:
+                remote[worker_id].append(username)
+            else:
+                statuses[username] = False
+        if remote:
+            results = await asyncio.gather(
+                *(
+                    self._send_remote(worker_id, worker_usernames, message, timeout)
+                    for worker_id, worker_usernames in remote.items()
+                )
+            )
+            for result in results:
+                statuses.update(result)
+        return statuses
+
+    def queue_stats(self) -> Dict:
+        depths = [len(outbox) for outbox in self.outboxes.values()]
+        return {
+            "connections": len(self.outboxes),
+            "queued": sum(depths),
+            "max_depth": max(depths, default=0),
+            "dropped": self.dropped
+            + sum(outbox.dropped for outbox in self.outboxes.values()),
+        }
+
+    async def _send_remote(
+        self,
+        worker_id: str,
+        usernames: List[str],
+        message: EncodedMessage,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, bool]:
+        try:
+            return await asyncio.wait_for(
+                self.backplane.request(
+                    worker_id,
+                    "send_frame",
+                    {
+                        "usernames": usernames,
+                        "type": message.type,
+                        "frame": message.frame(JSON_CODEC),
+                    },
+                ),
+                timeout,
+            )
+        except (BackplaneError, asyncio.TimeoutError):
+            return {username: False for username in usernames}
+
+    async def _handle_remote_frame(self, payload: Dict) -> Dict[str, bool]:
+        message = EncodedMessage(payload["type"], json_frame=payload["frame"])
+        statuses = {}
+        for username in payload["usernames"]:
+            outbox = self.outboxes.get(username)
+            if outbox is None:
+                statuses[username] = False
+                continue
+            statuses[username] = outbox.put(message.type, message.frame(outbox.codec))
+            self.metrics.ws_messages_out.inc(message.type)
+        return statuses
+
+    def _close_outbox(self, username: str):
+        outbox = self.outboxes.pop(username, None)
+        if outbox is not None:
+            self.dropped += outbox.dropped
+            outbox.close()
@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from tortoise.expressions import Q
+
+from app.core.enums import FriendshipStatus
+from app.models.models import Friendship
+
+
+class Adjacency:
+    __slots__ = ("friends", "incoming", "outgoing", "profiles")
+
+    def __init__(self):
+        # friend id -> friendship id
+        self.friends: Dict[int, int] = {}
+        # friendship id -> requester id / receiver id
+        self.incoming: Dict[int, int] = {}
+        self.outgoing: Dict[int, int] = {}
+        # related user id -> (username, name)
+        self.profiles: Dict[int, Tuple[str, str]] = {}
+
+    def related_ids(self) -> Set[int]:
+        related = set(self.friends)
+        related.update(self.incoming.values())
+        related.update(self.outgoing.values())
+        return related
+
+
+class FriendGraph:
+    """
+    Per-user friendship adjacency loaded lazily from the database and kept
+    in an LRU of `maxsize` users.
+
+    Friend handlers write through `add_request`, `accept` and `remove`;
+    other workers drop their copies through the backplane. Profiles of
+    related users live in each adjacency, so they are evicted with it.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.adjacency: "OrderedDict[int, Adjacency]" = OrderedDict()
+        # Change counters, kept only while a load of that user is running,
+        # so a load that raced a change is not cached.
+        self.versions: Dict[int, int] = {}
+        self.loads: Dict[int, int] = {}
+        self.backplane = None
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, backplane):
+        self.backplane = backplane
+        backplane.add_handler("friend_graph.invalidate", self._handle_invalidate)
+        backplane.add_handler("friend_graph.profile", self._handle_profile)
+
+    async def get(self, user_id: int) -> Adjacency:
+        adjacency = self.adjacency.get(user_id)
+        if adjacency is not None:
+            self.adjacency.move_to_end(user_id)
+            self.hits += 1
+            return adjacency
+        self.misses += 1
+        return await self._load(user_id)
+
+    async def friends(self, user_id: int) -> List[Dict]:
+        adjacency = await self.get(user_id)
+        return [
+            self._profile(adjacency, friend_id) for friend_id in adjacency.friends
+        ]
+
+    async def incoming_requests(self, user_id: int) -> List[Dict]:
+        adjacency = await self.get(user_id)
+        return [
+            {
+                "id": friendship_id,
+                "requester": self._profile(adjacency, requester_id),
+                "status": FriendshipStatus.pending,
+            }
+            for friendship_id, requester_id in adjacency.incoming.items()
+        ]
+
+    async def outgoing_requests(self, user_id: int) -> List[Dict]:
+        adjacency = await self.get(user_id)
+        return [
+            {
+                "id": friendship_id,
+                "receiver": self._profile(adjacency, receiver_id),
+                "status": FriendshipStatus.pending,
+            }
+            for friendship_id, receiver_id in adjacency.outgoing.items()
+        ]
+
+    async def related_ids(self, user_id: int) -> Set[int]:
+        adjacency = await self.get(user_id)
+        return adjacency.related_ids()
+
+    def update_profile(self, user_id: int, username: str, name: str):
+        self._set_profile(user_id, username, name)
+        if self.backplane:
+            self.backplane.broadcast(
+                "friend_graph.profile",
+                {"id": user_id, "username": username, "name": name},
+            )
+
+    def add_request(self, friendship_id: int, requester, receiver):
+        self._changed(requester.id, receiver.id)
+        requester_adjacency = self.adjacency.get(requester.id)
+        if requester_adjacency is not None:
+            requester_adjacency.outgoing[friendship_id] = receiver.id
+            requester_adjacency.profiles[receiver.id] = (
+                receiver.username or "",
+                receiver.name or "",
+            )
+        receiver_adjacency = self.adjacency.get(receiver.id)
+        if receiver_adjacency is not None:
+            receiver_adjacency.incoming[friendship_id] = requester.id
+            receiver_adjacency.profiles[requester.id] = (
+                requester.username or "",
+                requester.name or "",
+            )
+
+    def accept(self, friendship_id: int, requester_id: int, receiver_id: int):
+        self._changed(requester_id, receiver_id)
+        requester_adjacency = self.adjacency.get(requester_id)
+        if requester_adjacency is not None:
+            requester_adjacency.outgoing.pop(friendship_id, None)
+            requester_adjacency.friends[receiver_id] = friendship_id
+        receiver_adjacency = self.adjacency.get(receiver_id)
+        if receiver_adjacency is not None:
+            receiver_adjacency.incoming.pop(friendship_id, None)
+            receiver_adjacency.friends[requester_id] = friendship_id
+
+    def remove(self, friendship_id: int, requester_id: int, receiver_id: int):
+        self._changed(requester_id, receiver_id)
+        for user_id, other_id in (
+            (requester_id, receiver_id),
+            (receiver_id, requester_id),
+        ):
+            adjacency = self.adjacency.get(user_id)
+            if adjacency is None:
+                continue
+            adjacency.incoming.pop(friendship_id, None)
+            adjacency.outgoing.pop(friendship_id, None)
+            if adjacency.friends.get(other_id) == friendship_id:
+                del adjacency.friends[other_id]
+
+    def stats(self) -> Dict:
+        return {
+            "users": len(self.adjacency),
+            "profiles": sum(
+                len(adjacency.profiles) for adjacency in self.adjacency.values()
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    async def _load(self, user_id: int) -> Adjacency:
+        self.loads[user_id] = self.loads.get(user_id, 0) + 1
+        version = self.versions.setdefault(user_id, 0)
+        try:
+            rows = await Friendship.filter(
+                Q(requester_id=user_id) | Q(receiver_id=user_id)
+            ).values(
+                "id",
+                "status",
+                "requester_id",
+                "receiver_id",
+                "requester__username",
+                "requester__name",
+                "receiver__username",
+                "receiver__name",
+            )
+        finally:
+            changed = self.versions[user_id] != version
+            self.loads[user_id] -= 1
+            if not self.loads[user_id]:
+                del self.loads[user_id]
+                del self.versions[user_id]
+        adjacency = Adjacency()
+        for row in rows:
+            outgoing = row["requester_id"] == user_id
+            other_id = row["receiver_id"] if outgoing else row["requester_id"]
+            other = "receiver" if outgoing else "requester"
+            adjacency.profiles[other_id] = (
+                row[f"{other}__username"] or "",
+                row[f"{other}__name"] or "",
+            )
+            if row["status"] == FriendshipStatus.accepted:
+                adjacency.friends[other_id] = row["id"]
+            elif outgoing:
+                adjacency.outgoing[row["id"]] = other_id
+            else:
+                adjacency.incoming[row["id"]] = other_id
+        if not changed:
+            self.adjacency[user_id] = adjacency
+            while len(self.adjacency) > self.maxsize:
+                self.adjacency.popitem(last=False)
+        return adjacency
+
+    def _changed(self, *user_ids: int):
+        self._bump(user_ids)
+        if self.backplane:
+            self.backplane.broadcast(
+                "friend_graph.invalidate", {"user_ids": list(user_ids)}
+            )
+
+    def _bump(self, user_ids):
+        for user_id in user_ids:
+            if user_id in self.versions:
+                self.versions[user_id] += 1
+
+    def _profile(self, adjacency: Adjacency, user_id: int) -> Dict:
+        username, name = adjacency.profiles.get(user_id, ("", ""))
+        return {"id": user_id, "username": username, "name": name}
+
+    def _set_profile(self, user_id: int, username: Optional[str], name: Optional[str]):
+        """Update the profile in every cached adjacency that shows it."""
+        for adjacency in self.adjacency.values():
+            if user_id in adjacency.profiles:
+                adjacency.profiles[user_id] = (username or "", name or "")
+
+    async def _handle_invalidate(self, payload: Dict):
+        self._bump(payload["user_ids"])
+        for user_id in payload["user_ids"]:
+            self.adjacency.pop(user_id, None)
+
+    async def _handle_profile(self, payload: Dict):
+        self._set_profile(payload["id"], payload["username"], payload["name"])
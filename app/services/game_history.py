@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from tortoise.transactions import in_transaction
+
+from app.models.models import Game, GameAnswer, GamePlayer, UserStats
+from app.services.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# (user id, round, word id, correct, response time in ms)
+AnswerRow = Tuple[int, int, Optional[int], bool, int]
+
+
+class GameRecord:
+    """Everything persisted about one finished game, built in memory."""
+
+    __slots__ = (
+        "id",
+        "owner_id",
+        "words_count",
+        "round_duration",
+        "started_at",
+        "finished_at",
+        "players",
+        "answers",
+        "attempts",
+    )
+
+    def __init__(
+        self,
+        owner_id: int,
+        words_count: int,
+        round_duration: int,
+        started_at: datetime,
+        finished_at: datetime,
+        players: List[Tuple[int, int, int]],
+        answers: List[AnswerRow],
+    ):
+        self.id = uuid.uuid4()
+        self.owner_id = owner_id
+        self.words_count = words_count
+        self.round_duration = round_duration
+        self.started_at = started_at
+        self.finished_at = finished_at
+        # (user id, points, position)
+        self.players = players
+        self.answers = answers
+        self.attempts = 0
+
+
+class GameHistoryWriter:
+    """
+    Write-behind queue for finished games.
+
+    `record()` only appends to a bounded deque, so game code never waits on
+    the database. A single writer task drains up to `batch_size` games at a
+    time and stores them with multi-row inserts in one transaction, folding
+    the batch into per-user stats. When a batch fails its games are written
+    one by one; those that still fail go back to the front of the queue and
+    are retried on the next flush, up to `max_attempts` times.
+    When `max_pending` games are waiting the oldest one is dropped and
+    counted; `stop()` flushes what is left.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_attempts: int = 5,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.pending: Deque[GameRecord] = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = False
+        self.metrics = metrics or Metrics()
+        self.flush_duration = self.metrics.histogram(
+            "game_history_flush_seconds", "Time to persist one batch of games"
+        )
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+
+    def record(self, game: GameRecord):
+        if len(self.pending) >= self.max_pending:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append(game)
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+
+    def start(self):
+        if self.task is None:
+            self.stopping = False
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.stopping = True
+        self.wakeup.set()
+        if self.task:
+            await self.task
+            self.task = None
+        while self.pending:
+            await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self.pending),
+            "max_pending": self.max_pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+        }
+
+    async def flush(self) -> bool:
+        """Write one batch; False if it failed and was re-queued or dropped."""
+        batch = [
+            self.pending.popleft()
+            for _ in range(min(self.batch_size, len(self.pending)))
+        ]
+        if not batch:
+            return True
+        started = time.perf_counter()
+        try:
+            await self._write(batch)
+        except Exception:
+            logger.exception(
+                "Failed to persist game results",
+                extra={"event": "game_history.error", "games": len(batch)},
+            )
+            failed = await self._write_each(batch) if len(batch) > 1 else batch
+            self._requeue(failed)
+            return not failed
+        finally:
+            self.flush_duration.observe(time.perf_counter() - started)
+        self.written += len(batch)
+        self.batches += 1
+        return True
+
+    async def _write_each(self, batch: List[GameRecord]) -> List[GameRecord]:
+        """
+        Write the games of a failed batch one at a time, so that a single bad
+        record does not hold back the others. Returns the games that failed.
+        """
+        failed = []
+        for record in batch:
+            try:
+                await self._write([record])
+            except Exception:
+                failed.append(record)
+            else:
+                self.written += 1
+        return failed
+
+    def _requeue(self, batch: List[GameRecord]):
+        retry = []
+        for record in batch:
+            record.attempts += 1
+            if record.attempts < self.max_attempts:
+                retry.append(record)
+            else:
+                self.failed += 1
+        self.retried += len(retry)
+        self.pending.extendleft(reversed(retry))
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft()
+            self.dropped += 1
+
+    async def _run(self):
+        while not self.stopping:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            # Stop at a failed batch and retry it after the next interval.
+            while self.pending and await self.flush():
+                pass
+
+    async def _write(self, batch: List[GameRecord]):
+        games, players, answers = [], [], []
+        totals: Dict[int, List[int]] = {}
+        for record in batch:
+            games.append(
+                Game(
+                    id=record.id,
+                    owner_id=record.owner_id,
+                    words_count=record.words_count,
+                    players_count=len(record.players),
+                    round_duration=record.round_duration,
+                    started_at=record.started_at,
+                    finished_at=record.finished_at,
+                )
+            )
+            top_points = max((points for _, points, _ in record.players), default=0)
+            for user_id, points, position in record.players:
+                players.append(
+                    GamePlayer(
+                        game_id=record.id,
+                        user_id=user_id,
+                        points=points,
+                        position=position,
+                    )
+                )
+                total = totals.setdefault(user_id, [0, 0, 0, 0, 0, 0])
+                total[0] += 1
+                total[1] += int(points > 0 and points == top_points)
+                total[2] += points
+            for user_id, round, word_id, correct, response_ms in record.answers:
+                answers.append(
+                    GameAnswer(
+                        game_id=record.id,
+                        user_id=user_id,
+                        round=round,
+                        word_id=word_id,
+                        correct=correct,
+                        response_ms=response_ms,
+                    )
+                )
+                total = totals.setdefault(user_id, [0, 0, 0, 0, 0, 0])
+                total[3] += 1
+                total[4] += int(correct)
+                total[5] += response_ms
+
+        async with in_transaction() as connection:
+            await Game.bulk_create(games, using_db=connection)
+            await GamePlayer.bulk_create(players, using_db=connection)
+            if answers:
+                await GameAnswer.bulk_create(
+                    answers, batch_size=1000, using_db=connection
+                )
+            await self._add_stats(totals, connection)
+
+    async def _add_stats(self, totals: Dict[int, List[int]], connection):
+        # Create missing rows first, ignoring ones another worker inserted
+        # meanwhile, so that every row can be locked and updated below.
+        await UserStats.bulk_create(
+            [UserStats(user_id=user_id) for user_id in totals],
+            ignore_conflicts=True,
+            using_db=connection,
+        )
+        rows = (
+            await UserStats.filter(user_id__in=list(totals))
+            .select_for_update()
+            .using_db(connection)
+        )
+        for stats in rows:
+            total = totals[stats.user_id]
+            stats.games_played += total[0]
+            stats.games_won += total[1]
+            stats.total_points += total[2]
+            stats.answers += total[3]
+            stats.correct_answers += total[4]
+            stats.total_response_ms += total[5]
+        if rows:
+            await UserStats.bulk_update(
+                rows,
+                fields=[
+                    "games_played",
+                    "games_won",
+                    "total_points",
+                    "answers",
+                    "correct_answers",
+                    "total_response_ms",
+                ],
+                using_db=connection,
+            )
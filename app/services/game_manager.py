@@ -1,115 +1,221 @@
 import asyncio
-import datetime
-from typing import Dict, List
-from fastapi import WebSocket
-from app.core.config import GAMES
-from app.models.models import User, Word
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from tortoise import timezone
+
+from app.core.config import (
+    CONNECTION_MANAGER,
+    GAME_HISTORY,
+    GAMES,
+    LEADERBOARDS,
+    METRICS,
+    ROUND_SCHEDULER,
+)
 from app.core.enums import GameStatus, WSMessageTypes
-from datetime import datetime as innerdatetime, timedelta
+from app.services.answer_matcher import AnswerMatcher
+from app.services.game_history import GameRecord
+from app.services.scoreboard import Scoreboard
+
+START_COUNTDOWN = 3
+
+logger = logging.getLogger(__name__)
 
 
 class GameSession:
     def __init__(
         self,
-        owner: User,
-        owner_ws: WebSocket,
+        owner: Dict,
         words: List[dict],
         round_duration: int,
+        answer_max_typos: int = 0,
+        word_ids: Optional[List[int]] = None,
     ):
-        self.players = [
-            {"user": owner, "point": 0, "ws": owner_ws}
-        ]
+        self.scoreboard = Scoreboard()
+        self.scoreboard.add(owner)
         self.owner = owner
-        self.words: List[Word] = words
-        self.current_word_id = 0
+        self.words: List[dict] = words
+        self.word_ids = word_ids or [None] * len(words)
+        self.matchers = [
+            AnswerMatcher(word["en"], max_distance=answer_max_typos) for word in words
+        ]
+        self.current_matcher = None
+        self.current_word_id = -1
         self.game_status = GameStatus.pending
         self.round_duration = round_duration
         self.started = False
-        self.running_task = None
         self.answered_players = set()
+        self.pending_sends = set()
         self.lock = asyncio.Lock()
+        self.started_at = None
+        self.round_started = 0.0
+        # (user id, round, word id, correct, response ms) for the history.
+        self.answers = []
+
+    def info(self) -> Dict:
+        return {
+            "owner": self.owner["username"],
+            "words_len": len(self.words),
+            "round_duration": self.round_duration,
+        }
+
+    def player_users(self) -> List[Dict]:
+        return self.scoreboard.users()
 
     def broadcast(self, type: str, data: Dict):
-        for player in self.players:
-            self.send_to(player['ws'], type=type, data=data)
+        usernames = self.scoreboard.usernames()
+        self._spawn(CONNECTION_MANAGER.broadcast(usernames, type=type, data=data))
+
+    def send_to(self, username: str, type: str, data: Dict = {}):
+        self._spawn(CONNECTION_MANAGER.send_message(username, type=type, data=data))
 
-    def send_to(self, ws: WebSocket, type: str, data: Dict = {}):
-        try:
-            asyncio.create_task(ws.send_json({"type": type, "data": data}))
-        except:
-            pass
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.pending_sends.add(task)
+        task.add_done_callback(self.pending_sends.discard)
+
+    @asynccontextmanager
+    async def locked(self, operation: str):
+        started = time.perf_counter()
+        async with self.lock:
+            METRICS.lock_wait.observe(time.perf_counter() - started, operation)
+            yield
+
+    async def add_player(self, user: Dict) -> bool:
+        async with self.locked("add_player"):
+            if self.game_status != GameStatus.pending:
+                return False
+            self.scoreboard.add(user)
+            return True
 
     async def start_game(self):
-        if len(self.players) > 1:
-            async with self.lock:
+        if len(self.scoreboard) > 1 and self.game_status == GameStatus.pending:
+            async with self.locked("start_game"):
                 self.game_status = GameStatus.active
-                self.running_task = asyncio.create_task(self.round_timer_loop())
+                self.started_at = timezone.now()
+                self.broadcast(
+                    WSMessageTypes.GAME_STARTED,
+                    {
+                        "users_count": len(self.scoreboard),
+                        "leaderboard": self.scoreboard.snapshot(),
+                    },
+                )
+                ROUND_SCHEDULER.schedule(self, START_COUNTDOWN)
+            logger.info(
+                "Game started",
+                extra={
+                    "event": "game.start",
+                    "game_id": self.owner["username"],
+                    "players": len(self.scoreboard),
+                },
+            )
+            return True
         else:
             return False
 
-    async def round_timer_loop(self):
+    def advance(self):
+        """
+        Move to the next word, or finish the game after the last one.
+        Called by the round scheduler when the round deadline passes or
+        every player has answered.
+        """
+        index = self.current_word_id + 1
+        if index > 0:
+            self.publish_leaderboard(index - 1)
+        if index >= len(self.words):
+            self.end_game()
+            return
+        word = self.words[index]
+        self.started = True
+        self.current_word_id = index
+        self.answered_players = set()
+        self.current_word = word
+        self.current_matcher = self.matchers[index]
+        self.round_started = time.monotonic()
         self.broadcast(
-            WSMessageTypes.GAME_STARTED,
-            {
-                "users_count": len(self.players),
-            },
+            type=WSMessageTypes.NEXT_WORD,
+            data={
+                "index": index,
+                "word": word['uz']
+            }
         )
-        await asyncio.sleep(3)
-        for index, word in enumerate(self.words):
-            async with self.lock:
-                self.started = True
-                self.answered_players = set()
-                self.current_word = word.data
-                self.current_deadline = innerdatetime.now(
-                    datetime.timezone.utc
-                ) + timedelta(seconds=self.round_duration)
+        ROUND_SCHEDULER.schedule(self, self.round_duration)
+
+    def publish_leaderboard(self, round: int):
+        changes = self.scoreboard.delta()
+        if changes:
             self.broadcast(
-                type=WSMessageTypes.NEXT_WORD,
-                data={
-                    "index": index,
-                    "word": word.data['uz']
-                }
+                type=WSMessageTypes.LEADERBOARD_UPDATE,
+                data={"round": round, "changes": changes},
             )
 
-            await asyncio.sleep(self.round_duration)
-        await self.end_game()
-
-
-    async def submit_answer(self, ws: WebSocket, username: str, word: str):
-        async with self.lock:
+    async def submit_answer(self, username: str, word: str):
+        async with self.locked("submit_answer"):
             if username in self.answered_players:
-                self.send_to(ws, type=WSMessageTypes.ALREADY_ANSWERED)
+                self.send_to(username, type=WSMessageTypes.ALREADY_ANSWERED)
                 return
 
-            player = next((p for p in self.players if p["user"].username == username), None)
+            player = self.scoreboard.get(username)
             if not player:
                 return
 
-            if word.lower() in self.current_word['en']:
-                player["point"] += 1
+            if self.current_matcher is None:
+                return
+
+            correct = self.current_matcher.matches(word)
+            if correct:
+                self.scoreboard.award(player)
                 self.answered_players.add(username)
-                self.send_to(ws, type=WSMessageTypes.CORRECT_ANSWER)
+                self.send_to(username, type=WSMessageTypes.CORRECT_ANSWER)
             else:
-                self.send_to(ws, type=WSMessageTypes.INCORRECT_ANSWER)
+                self.send_to(username, type=WSMessageTypes.INCORRECT_ANSWER)
                 self.answered_players.add(username)
+            self.answers.append(
+                (
+                    player.id,
+                    self.current_word_id,
+                    self.word_ids[self.current_word_id],
+                    correct,
+                    int((time.monotonic() - self.round_started) * 1000),
+                )
+            )
+
+            if len(self.answered_players) >= len(self.scoreboard):
+                ROUND_SCHEDULER.advance_now(self)
 
-    async def end_game(self):
+    def end_game(self):
         self.started = False
-        players = [{
-            "user": {
-                "id": player['user'].id,
-                "name": player['user'].name,
-                "username": player['user'].username
-            },
-            "point": player['point']
-        } for player in self.players]
-        sorted_players = sorted(players, key=lambda x: (-x["point"]))
+        self.game_status = GameStatus.finished
+        ROUND_SCHEDULER.cancel(self)
+        GAMES.remove(self.owner["username"])
         self.broadcast(
             type=WSMessageTypes.END_GAME,
             data={
-                "result": sorted_players
+                "result": self.scoreboard.result()
             }
         )
-        GAMES.pop(self.owner.username)
-        if self.running_task:
-            self.running_task.cancel()
+        for player in self.scoreboard.ranking:
+            LEADERBOARDS.add_points(player.id, player.points)
+        GAME_HISTORY.record(
+            GameRecord(
+                owner_id=self.owner["id"],
+                words_count=len(self.words),
+                round_duration=self.round_duration,
+                started_at=self.started_at or timezone.now(),
+                finished_at=timezone.now(),
+                players=[
+                    (player.id, player.points, player.position)
+                    for player in self.scoreboard.ranking
+                ],
+                answers=self.answers,
+            )
+        )
+        logger.info(
+            "Game finished",
+            extra={
+                "event": "game.end",
+                "game_id": self.owner["username"],
+                "players": len(self.scoreboard),
+            },
+        )
@@ -0,0 +1,154 @@
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.core.enums import GameStatus
+from app.services.backplane import BackplaneError, InProcessBackplane
+
+if TYPE_CHECKING:
+    from app.services.game_manager import GameSession
+
+GAMES_NAMESPACE = "games"
+
+
+class LocalGameRegistry:
+    """
+    Game sessions of this process keyed by game id (the owner's username).
+
+    Operations return plain dicts so that a routed implementation can ship
+    them between workers unchanged.
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, "GameSession"] = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, game_id: str) -> Optional["GameSession"]:
+        return self.sessions.get(game_id)
+
+    async def exists(self, game_id: str) -> bool:
+        return game_id in self.sessions
+
+    async def create(self, game_id: str, session: "GameSession") -> bool:
+        if game_id in self.sessions:
+            return False
+        self.sessions[game_id] = session
+        return True
+
+    def remove(self, game_id: str):
+        self.sessions.pop(game_id, None)
+
+    async def join(self, game_id: str, user: Dict) -> Dict:
+        session = self.get(game_id)
+        if session is None:
+            return {"status": "not_found"}
+        # `started` only flips on the first round; the countdown before it
+        # already counts as started.
+        if session.game_status != GameStatus.pending:
+            return {"status": "started"}
+        if not await session.add_player(user):
+            return {"status": "started"}
+        return {
+            "status": "ok",
+            "game": session.info(),
+            "players": session.player_users(),
+        }
+
+    async def start(self, game_id: str) -> Dict:
+        session = self.get(game_id)
+        if session is None:
+            return {"status": "not_found"}
+        if session.game_status != GameStatus.pending:
+            return {"status": "started"}
+        return {"status": "ok" if await session.start_game() else "failed"}
+
+    async def submit_answer(self, game_id: str, username: str, answer: str):
+        session = self.get(game_id)
+        if session is not None:
+            await session.submit_answer(username, answer)
+
+
+class BackplaneGameRegistry(LocalGameRegistry):
+    """
+    Registry shared by several workers through a backplane.
+
+    The worker that creates a game claims its id and keeps the session;
+    join/start/answer calls that land elsewhere are forwarded to the owner.
+    """
+
+    def __init__(self, backplane: InProcessBackplane):
+        super().__init__()
+        self.backplane = backplane
+        backplane.add_handler("game.join", self._handle_join)
+        backplane.add_handler("game.start", self._handle_start)
+        backplane.add_handler("game.submit_answer", self._handle_submit_answer)
+
+    async def exists(self, game_id: str) -> bool:
+        if game_id in self.sessions:
+            return True
+        return self.backplane.owner(GAMES_NAMESPACE, game_id) is not None
+
+    async def create(self, game_id: str, session: "GameSession") -> bool:
+        if game_id in self.sessions:
+            return False
+        if not self.backplane.claim(GAMES_NAMESPACE, game_id):
+            return False
+        self.sessions[game_id] = session
+        return True
+
+    def remove(self, game_id: str):
+        super().remove(game_id)
+        self.backplane.release(GAMES_NAMESPACE, game_id)
+
+    async def join(self, game_id: str, user: Dict) -> Dict:
+        if game_id in self.sessions:
+            return await super().join(game_id, user)
+        return await self._forward(
+            game_id,
+            "game.join",
+            {"game_id": game_id, "user": user},
+            {"status": "not_found"},
+        )
+
+    async def start(self, game_id: str) -> Dict:
+        if game_id in self.sessions:
+            return await super().start(game_id)
+        return await self._forward(
+            game_id, "game.start", {"game_id": game_id}, {"status": "not_found"}
+        )
+
+    async def submit_answer(self, game_id: str, username: str, answer: str):
+        if game_id in self.sessions:
+            return await super().submit_answer(game_id, username, answer)
+        await self._forward(
+            game_id,
+            "game.submit_answer",
+            {"game_id": game_id, "username": username, "answer": answer},
+            None,
+        )
+
+    async def _forward(self, game_id: str, kind: str, payload: Dict, default):
+        worker_id = self.backplane.owner(GAMES_NAMESPACE, game_id)
+        if worker_id is None or worker_id == self.backplane.worker_id:
+            return default
+        try:
+            return await self.backplane.request(worker_id, kind, payload)
+        except BackplaneError:
+            return default
+
+    async def _handle_join(self, payload: Dict) -> Dict:
+        return await LocalGameRegistry.join(self, payload["game_id"], payload["user"])
+
+    async def _handle_start(self, payload: Dict) -> Dict:
+        return await LocalGameRegistry.start(self, payload["game_id"])
+
+    async def _handle_submit_answer(self, payload: Dict):
+        await LocalGameRegistry.submit_answer(
+            self, payload["game_id"], payload["username"], payload["answer"]
+        )
+
+
+def create_game_registry(backplane: InProcessBackplane) -> LocalGameRegistry:
+    if type(backplane) is InProcessBackplane:
+        return LocalGameRegistry()
+    return BackplaneGameRegistry(backplane)
@@ -0,0 +1,288 @@
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.enums import LeaderboardType
+from app.models.models import User, UserStats
+from app.services.user_search import UserSearchIndex
+
+MAX_LEVEL = 24
+
+Key = Tuple[int, int]
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # Level-0 steps to next[level]; towards the end it counts up to one
+        # past the last element.
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """
+    Sorted set of unique keys with O(log n) expected insert, remove, rank
+    (`bisect_left`) and positional lookup, via skip-list links that also
+    store how many elements each link jumps over.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.head = _Node(None, MAX_LEVEL)
+        self.size = 0
+        self.rng = rng or random.Random()
+
+    def __len__(self):
+        return self.size
+
+    def build(self, keys: Iterable[Key]):
+        """Replace the contents with already sorted, unique `keys` in O(n)."""
+        self.head = _Node(None, MAX_LEVEL)
+        tails = [self.head] * MAX_LEVEL
+        tail_positions = [0] * MAX_LEVEL
+        position = 0
+        for position, key in enumerate(keys, 1):
+            node = _Node(key, self._random_level())
+            for i in range(len(node.next)):
+                tails[i].next[i] = node
+                tails[i].width[i] = position - tail_positions[i]
+                tails[i] = node
+                tail_positions[i] = position
+        for i in range(MAX_LEVEL):
+            tails[i].width[i] = position + 1 - tail_positions[i]
+        self.size = position
+
+    def insert(self, key: Key):
+        chain, steps_at_level = self._search(key)
+        level = self._random_level()
+        node = _Node(key, level)
+        steps = 0
+        for i in range(level):
+            prev = chain[i]
+            node.next[i] = prev.next[i]
+            prev.next[i] = node
+            node.width[i] = prev.width[i] - steps
+            prev.width[i] = steps + 1
+            steps += steps_at_level[i]
+        for i in range(level, MAX_LEVEL):
+            chain[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key: Key):
+        chain, _ = self._search(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for i in range(len(node.next)):
+            prev = chain[i]
+            prev.width[i] += node.width[i] - 1
+            prev.next[i] = node.next[i]
+        for i in range(len(node.next), MAX_LEVEL):
+            chain[i].width[i] -= 1
+        self.size -= 1
+
+    def bisect_left(self, key: Key) -> int:
+        """Number of keys smaller than `key`."""
+        node = self.head
+        position = 0
+        for i in reversed(range(MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+        return position
+
+    def iter_from(self, index: int) -> Iterator[Key]:
+        """Keys in order starting at position `index`."""
+        if index < 0 or index >= self.size:
+            return
+        node = self.head
+        remaining = index + 1
+        for i in reversed(range(MAX_LEVEL)):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def _search(self, key: Key):
+        chain = [self.head] * MAX_LEVEL
+        steps_at_level = [0] * MAX_LEVEL
+        node = self.head
+        for i in reversed(range(MAX_LEVEL)):
+            while node.next[i] is not None and node.next[i].key < key:
+                steps_at_level[i] += node.width[i]
+                node = node.next[i]
+            chain[i] = node
+        return chain, steps_at_level
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self.rng.random() < 0.5:
+            level += 1
+        return level
+
+
+class Leaderboard:
+    """
+    Scores by user id ranked highest first. Ties share a rank (1, 2, 2, 4)
+    and are listed by user id.
+    """
+
+    def __init__(self):
+        self.scores: Dict[int, int] = {}
+        self.ranking = IndexableSkipList()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def load(self, scores: Dict[int, int]):
+        self.scores = dict(scores)
+        self.ranking.build(
+            sorted((-score, user_id) for user_id, score in self.scores.items())
+        )
+
+    def set(self, user_id: int, score: int):
+        previous = self.scores.get(user_id)
+        if previous == score:
+            return
+        if previous is not None:
+            self.ranking.remove((-previous, user_id))
+        self.scores[user_id] = score
+        self.ranking.insert((-score, user_id))
+
+    def rank_of_score(self, score: int) -> int:
+        return self.ranking.bisect_left((-score, -1)) + 1
+
+    def rank(self, user_id: int) -> Optional[int]:
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.rank_of_score(score)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, int, int]]:
+        """`(rank, user id, score)` rows starting at position `offset`."""
+        rows = []
+        rank, previous = 0, None
+        for position, (negative, user_id) in enumerate(
+            self.ranking.iter_from(offset), offset
+        ):
+            if len(rows) >= limit:
+                break
+            score = -negative
+            if score != previous:
+                rank = (
+                    self.rank_of_score(score) if previous is None else position + 1
+                )
+                previous = score
+            rows.append((rank, user_id, score))
+        return rows
+
+
+class Leaderboards:
+    """
+    In-memory global leaderboards by completed unit and by game points.
+
+    Loaded once at startup; `set_completed_unit` and `add_points` apply
+    changes in O(log n) and other workers follow through the backplane.
+    Completed units are broadcast as absolute values, points as deltas so
+    that games ending at once on two workers both count.
+    Names come from the user search index, which already holds every user.
+    """
+
+    def __init__(self, user_search: UserSearchIndex):
+        self.user_search = user_search
+        self.boards = {board: Leaderboard() for board in LeaderboardType}
+        self.backplane = None
+
+    def attach(self, backplane):
+        self.backplane = backplane
+        backplane.add_handler("leaderboards.update", self._handle_update)
+        backplane.add_handler("leaderboards.add_points", self._handle_add_points)
+
+    async def load(self):
+        units = dict(await User.all().values_list("id", "completed_unit"))
+        points = dict.fromkeys(units, 0)
+        points.update(
+            await UserStats.all().values_list("user_id", "total_points")
+        )
+        boards = {board: Leaderboard() for board in LeaderboardType}
+        boards[LeaderboardType.units].load(units)
+        boards[LeaderboardType.points].load(points)
+        self.boards = boards
+
+    def add_user(self, user_id: int):
+        self._update(LeaderboardType.units, user_id, 0)
+        self.add_points(user_id, 0)
+
+    def set_completed_unit(self, user_id: int, completed_unit: int):
+        self._update(LeaderboardType.units, user_id, completed_unit)
+
+    def add_points(self, user_id: int, points: int):
+        if not points and user_id in self.boards[LeaderboardType.points].scores:
+            return
+        self._add_points(user_id, points)
+        if self.backplane:
+            self.backplane.broadcast(
+                "leaderboards.add_points", {"user_id": user_id, "points": points}
+            )
+
+    def page(self, board: LeaderboardType, offset: int, limit: int) -> Dict:
+        leaderboard = self.boards[board]
+        return {
+            "total": len(leaderboard),
+            "items": [
+                self._entry(rank, user_id, score)
+                for rank, user_id, score in leaderboard.page(offset, limit)
+            ],
+        }
+
+    def standing(self, board: LeaderboardType, user_id: int) -> Optional[Dict]:
+        leaderboard = self.boards[board]
+        rank = leaderboard.rank(user_id)
+        if rank is None:
+            return None
+        return self._entry(rank, user_id, leaderboard.scores[user_id])
+
+    def among(self, board: LeaderboardType, user_ids) -> List[Dict]:
+        """Ranking restricted to `user_ids`, e.g. a user and their friends."""
+        scores = self.boards[board].scores
+        rows = sorted(
+            (-scores[user_id], user_id) for user_id in user_ids if user_id in scores
+        )
+        entries = []
+        rank, previous = 0, None
+        for position, (negative, user_id) in enumerate(rows, 1):
+            if negative != previous:
+                rank, previous = position, negative
+            entries.append(self._entry(rank, user_id, -negative))
+        return entries
+
+    def _entry(self, rank: int, user_id: int, score: int) -> Dict:
+        username, name = self.user_search.users.get(user_id, ("", ""))
+        return {
+            "rank": rank,
+            "user": {"id": user_id, "username": username, "name": name},
+            "score": score,
+        }
+
+    def _update(self, board: LeaderboardType, user_id: int, score: int):
+        self.boards[board].set(user_id, score)
+        if self.backplane:
+            self.backplane.broadcast(
+                "leaderboards.update",
+                {"board": board.value, "user_id": user_id, "score": score},
+            )
+
+    def _add_points(self, user_id: int, points: int):
+        board = self.boards[LeaderboardType.points]
+        board.set(user_id, board.scores.get(user_id, 0) + points)
+
+    async def _handle_add_points(self, payload: Dict):
+        self._add_points(payload["user_id"], payload["points"])
+
+    async def _handle_update(self, payload: Dict):
+        self.boards[LeaderboardType(payload["board"])].set(
+            payload["user_id"], payload["score"]
+        )
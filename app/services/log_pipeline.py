@@ -0,0 +1,124 @@
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line. Anything passed through `extra=` (user,
+    game_id, type, latency_ms, ...) becomes a top-level field.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        elif record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records whose `event` has a sample rate."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, "event", None))
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without blocking: when the queue
+    is full the record is dropped and counted. Only the message arguments
+    and traceback are rendered here; JSON encoding happens in the listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BlockingSentinelListener(QueueListener):
+    # The stock listener uses put_nowait, which fails when the queue is full
+    # at shutdown.
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Routes the root logger through a bounded queue to a listener thread
+    that writes JSON lines to `stream`, so log I/O never runs on the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        queue_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        stream=None,
+    ):
+        self.level = level.upper()
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(SamplingFilter(sample_rates or {}))
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter())
+        self.listener = BlockingSentinelListener(self.queue, output)
+        self.started = False
+
+    def install(self):
+        root = logging.getLogger()
+        if self.handler not in root.handlers:
+            root.addHandler(self.handler)
+        root.setLevel(self.level)
+
+    def start(self):
+        if not self.started:
+            self.install()
+            self.listener.start()
+            self.started = True
+
+    def stop(self):
+        if self.started:
+            self.listener.stop()
+            self.started = False
+
+    def stats(self) -> Dict:
+        return {"queued": self.queue.qsize(), "dropped": self.handler.dropped}
@@ -0,0 +1,135 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.services.metrics import Metrics
+
+
+class LoopMonitor:
+    """
+    Opt-in event-loop lag monitor.
+
+    A heartbeat task on the loop measures how late each tick wakes up. A
+    watchdog thread notices when the heartbeat stops for longer than
+    `threshold` and samples the loop thread's stack while it is still
+    blocked, so the sample points at the offending callback rather than at
+    whatever ran afterwards. Samples are kept in a ring buffer of `size`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+        size: int = 100,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: deque = deque(maxlen=size)
+        self.metrics = metrics or Metrics()
+        self.lag = self.metrics.histogram(
+            "event_loop_lag_seconds", "Heartbeat wake-up delay of the event loop"
+        )
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+        self.last_beat = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        # Sample taken during the current stall, finished by the next beat.
+        self.open_sample: Optional[Dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None
+
+    async def start(self):
+        if self.task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stopping.clear()
+        self.task = asyncio.create_task(self._heartbeat())
+        self.watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self.watchdog.start()
+
+    async def stop(self):
+        self.stopping.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        if self.watchdog:
+            self.watchdog.join(timeout=1)
+            self.watchdog = None
+
+    def stats(self) -> Dict:
+        return {
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "stalls": self.stalls,
+            "samples": len(self.samples),
+        }
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        samples = list(self.samples)
+        samples.reverse()
+        return samples[:limit] if limit else samples
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last_beat = time.monotonic()
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.lag.observe(lag)
+            sample = self.open_sample
+            if sample is not None:
+                sample["blocked_for"] = round(lag, 6)
+                self.open_sample = None
+
+    def _watch(self):
+        poll = max(self.threshold / 4, 0.005)
+        while not self.stopping.wait(poll):
+            blocked_for = time.monotonic() - self.last_beat - self.interval
+            if blocked_for < self.threshold or self.open_sample is not None:
+                continue
+            sample = self._sample(blocked_for)
+            if sample is not None:
+                self.stalls += 1
+                self.open_sample = sample
+                self.samples.append(sample)
+
+    def _sample(self, blocked_for: float) -> Optional[Dict]:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return None
+        stack = traceback.extract_stack(frame)
+        task = None
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            pass
+        coro = task.get_coro() if task is not None else None
+        return {
+            "at": time.time(),
+            "blocked_for": round(blocked_for, 6),
+            "task": task.get_name() if task is not None else None,
+            "coroutine": getattr(coro, "__qualname__", None),
+            "stack": [
+                f"{entry.filename}:{entry.lineno} in {entry.name}"
+                for entry in stack
+            ],
+        }
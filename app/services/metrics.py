@@ -0,0 +1,296 @@
+import bisect
+import contextvars
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROUTERS = {
+    "auth", "dict", "friends", "game", "leaderboard", "ws", "metrics", "admin"
+}
+QUERY_METHODS = (
+    "execute_insert",
+    "execute_query",
+    "execute_query_dict",
+    "execute_many",
+    "execute_script",
+)
+
+# Mutable per-request holder so queries made in child tasks still count.
+query_count: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "query_count", default=None
+)
+# Set while a counted query runs, so backends whose methods call each other
+# count once.
+in_query: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "in_query", default=False
+)
+
+
+def _labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    value = getattr(value, "value", value)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    """Set directly, or read from `callback` when scraped."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def set(self, *labels, value: float):
+        self.values[labels] = value
+
+    def samples(self):
+        if self.callback is not None:
+            yield self.name, "", self.callback()
+            return
+        yield from super().samples()
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self.values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self):
+        for labels, (counts, total) in self.values.items():
+            names = self.label_names + ("le",)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    _labels(names, labels + (bound,)),
+                    cumulative,
+                )
+            label_text = _labels(self.label_names, labels)
+            yield f"{self.name}_sum", label_text, total
+            yield f"{self.name}_count", label_text, cumulative
+
+
+class Metrics:
+    """
+    In-process metrics rendered in the Prometheus text format.
+
+    Hot paths only bump dict entries; gauges that mirror service state
+    (connections, games, cache stats) are read when `/metrics` is scraped.
+    """
+
+    def __init__(self, prefix: str = "english"):
+        self.prefix = prefix
+        self.metrics = []
+        self.stats_sources: List[Tuple[str, Callable[[], Dict]]] = []
+        self.request_latency = self.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by router",
+            ("router", "method", "status"),
+        )
+        self.db_queries = self.histogram(
+            "db_queries_per_request",
+            "Database queries issued while handling one HTTP request",
+            ("router",),
+            buckets=COUNT_BUCKETS,
+        )
+        self.db_queries_total = self.counter(
+            "db_queries_total", "Database queries by router", ("router",)
+        )
+        self.ws_messages_in = self.counter(
+            "ws_messages_in_total", "WebSocket messages received by type", ("type",)
+        )
+        self.ws_messages_out = self.counter(
+            "ws_messages_out_total", "WebSocket messages queued by type", ("type",)
+        )
+        self.round_drift = self.histogram(
+            "round_timer_drift_seconds",
+            "Delay between a round deadline and the round advancing",
+        )
+        self.lock_wait = self.histogram(
+            "game_lock_wait_seconds",
+            "Time spent waiting for a game session lock",
+            ("operation",),
+        )
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(f"{self.prefix}_{name}", help, labels))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        return self._add(Gauge(f"{self.prefix}_{name}", help, labels, callback))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(f"{self.prefix}_{name}", help, labels, buckets))
+
+    def add_stats(self, name: str, source: Callable[[], Dict]):
+        """Expose the numeric values of a service's `stats()` as gauges."""
+        self.stats_sources.append((f"{self.prefix}_{name}", source))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        for prefix, source in self.stats_sources:
+            for key, value in source().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_number(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def router_label(path: str, root_path: str = "") -> str:
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    segment = path.lstrip("/").split("/", 1)[0]
+    return segment if segment in ROUTERS else "other"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing HTTP requests per router and counting the
+    database queries each one issues. WebSocket scopes pass through.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        router = router_label(scope["path"], scope.get("root_path", ""))
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = query_count.set(queries)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.request_latency.observe(
+                time.perf_counter() - started,
+                router,
+                scope["method"],
+                status_code[0],
+            )
+            self.metrics.db_queries.observe(queries[0], router)
+            if queries[0]:
+                self.metrics.db_queries_total.inc(router, amount=queries[0])
+            query_count.reset(token)
+
+
+def instrument_db_client(client):
+    """
+    Count queries run through `client`'s class (and the transaction
+    wrappers that inherit from it) against the current request.
+    """
+    cls = type(client)
+    for method_name in QUERY_METHODS:
+        method = getattr(cls, method_name, None)
+        if method is None or getattr(method, "_counts_queries", False):
+            continue
+        setattr(cls, method_name, _counting(method))
+
+
+def _counting(method):
+    async def wrapper(*args, **kwargs):
+        queries = query_count.get()
+        if queries is None or in_query.get():
+            return await method(*args, **kwargs)
+        queries[0] += 1
+        token = in_query.set(True)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            in_query.reset(token)
+
+    wrapper._counts_queries = True
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
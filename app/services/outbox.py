@@ -0,0 +1,98 @@
+import asyncio
+from collections import deque
+from typing import Deque, Optional, Tuple, Union
+
+from fastapi import WebSocket
+
+from app.services.codec import JSON_CODEC
+
+DROP = "drop"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+
+
+class Outbox:
+    """
+    Bounded queue of pre-encoded frames for one WebSocket, drained by a
+    single writer task.
+
+    When the queue is full the slow-consumer policy decides what happens:
+    `drop` discards the oldest frame, `coalesce` discards the oldest frame of
+    the same message type (falling back to the oldest frame), and
+    `disconnect` closes the socket.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int,
+        policy: str = DROP,
+        codec=JSON_CODEC,
+    ):
+        self.websocket = websocket
+        self.codec = codec
+        self.max_size = max_size
+        self.policy = policy
+        self.frames: Deque[Tuple[str, Union[str, bytes]]] = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.task = asyncio.create_task(self._drain())
+        self.close_task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def put(self, type: str, frame: Union[str, bytes]) -> bool:
+        if self.closed:
+            return False
+        if len(self.frames) >= self.max_size:
+            if self.policy == DISCONNECT:
+                self.dropped += len(self.frames) + 1
+                self.close()
+                self.close_task = asyncio.create_task(self._close_socket())
+                return False
+            if self.policy != COALESCE or not self._drop_same_type(type):
+                self.frames.popleft()
+            self.dropped += 1
+        self.frames.append((type, frame))
+        self.ready.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self.frames.clear()
+        self.task.cancel()
+
+    def _drop_same_type(self, type: str) -> bool:
+        for index, (queued_type, _) in enumerate(self.frames):
+            if queued_type == type:
+                del self.frames[index]
+                return True
+        return False
+
+    async def _drain(self):
+        try:
+            while True:
+                if not self.frames:
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+                _, frame = self.frames.popleft()
+                if self.codec.binary:
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(frame)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True
+            self.frames.clear()
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1008)
+        except Exception:
+            pass
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from typing import Dict
+
+from app.core.enums import FriendshipStatus, WSMessageTypes
+from app.models.models import Friendship
+from app.services.connection_manager import ConnectionManager
+
+
+class RequestCounters:
+    """
+    Pending incoming friend request count per user id.
+
+    Counts are rebuilt with one COUNT query on a miss, kept in an LRU of
+    `maxsize` users and adjusted write-through by the friend handlers, which
+    also push the new value to the user over WebSocket.
+    """
+
+    def __init__(self, maxsize: int, connection_manager: ConnectionManager):
+        self.maxsize = maxsize
+        self.connection_manager = connection_manager
+        self.counts: "OrderedDict[int, int]" = OrderedDict()
+        # Change counters, kept only while a load of that user is running,
+        # so a load that raced a change is not cached.
+        self.versions: Dict[int, int] = {}
+        self.loads: Dict[int, int] = {}
+        connection_manager.backplane.add_handler(
+            "request_counters.invalidate", self._handle_invalidate
+        )
+
+    async def get(self, user_id: int) -> int:
+        count = self.counts.get(user_id)
+        if count is None:
+            return await self._load(user_id)
+        self.counts.move_to_end(user_id)
+        return count
+
+    async def change(self, user_id: int, username: str, delta: int) -> int:
+        """
+        Apply `delta` after the Friendship row has been written and push the
+        new count to `username`.
+        """
+        self._bump(user_id)
+        count = self.counts.get(user_id)
+        if count is None:
+            count = await self._load(user_id)
+        else:
+            count = max(0, count + delta)
+            self.counts[user_id] = count
+        self.connection_manager.backplane.broadcast(
+            "request_counters.invalidate", {"user_id": user_id}
+        )
+        await self.connection_manager.send_message(
+            username,
+            type=WSMessageTypes.REQUESTS_COUNT,
+            data={"requests_count": count},
+        )
+        return count
+
+    async def _load(self, user_id: int) -> int:
+        self.loads[user_id] = self.loads.get(user_id, 0) + 1
+        version = self.versions.setdefault(user_id, 0)
+        try:
+            count = await Friendship.filter(
+                receiver_id=user_id, status=FriendshipStatus.pending
+            ).count()
+        finally:
+            changed = self.versions[user_id] != version
+            self.loads[user_id] -= 1
+            if not self.loads[user_id]:
+                del self.loads[user_id]
+                del self.versions[user_id]
+        if not changed:
+            self.counts[user_id] = count
+            while len(self.counts) > self.maxsize:
+                self.counts.popitem(last=False)
+        return count
+
+    async def _handle_invalidate(self, payload: Dict):
+        user_id = payload["user_id"]
+        self._bump(user_id)
+        self.counts.pop(user_id, None)
+
+    def _bump(self, user_id: int):
+        if user_id in self.versions:
+            self.versions[user_id] += 1
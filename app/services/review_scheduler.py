@@ -0,0 +1,326 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.models.models import Review
+from app.services.metrics import Metrics
+from app.services.word_catalog import WordCatalog
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+
+def sm2(
+    repetitions: int, interval: int, ease: float, quality: int
+) -> Tuple[int, int, float]:
+    """
+    One SM-2 step. `quality` is 0-5; below 3 the word starts over.
+    Returns the new (repetitions, interval in days, ease factor).
+    """
+    if quality < 3:
+        repetitions, interval = 0, 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        repetitions += 1
+    ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return repetitions, interval, max(MIN_EASE, ease)
+
+
+class ReviewState:
+    __slots__ = ("repetitions", "interval", "ease", "due", "attempts")
+
+    def __init__(self, repetitions: int, interval: int, ease: float, due: float):
+        self.repetitions = repetitions
+        self.interval = interval
+        self.ease = ease
+        self.due = due
+        # Failed attempts to write this outcome.
+        self.attempts = 0
+
+
+class ReviewQueue:
+    """
+    One user's reviewed words plus a min-heap of `(due, word id)`.
+
+    Rescheduling pushes a new heap entry; entries whose due time no longer
+    matches the word's state are skipped when they surface.
+    """
+
+    def __init__(self):
+        self.states: Dict[int, ReviewState] = {}
+        self.heap: List[Tuple[float, int]] = []
+        # Position in `cursor_ids` (a catalog snapshot) before which every
+        # word has been reviewed.
+        self.new_cursor = 0
+        self.cursor_ids = None
+
+    def __len__(self):
+        return len(self.states)
+
+    def set(self, word_id: int, state: ReviewState):
+        self.states[word_id] = state
+        heapq.heappush(self.heap, (state.due, word_id))
+        if len(self.heap) > 2 * len(self.states) + 64:
+            self.heap = [(s.due, w) for w, s in self.states.items()]
+            heapq.heapify(self.heap)
+
+    def due(self, limit: int, now: float) -> List[Tuple[int, float]]:
+        """Up to `limit` due `(word id, due)` pairs, earliest first."""
+        taken = []
+        while self.heap and len(taken) < limit and self.heap[0][0] <= now:
+            due, word_id = heapq.heappop(self.heap)
+            state = self.states.get(word_id)
+            if state is not None and state.due == due:
+                taken.append((word_id, due))
+        for entry in taken:
+            heapq.heappush(self.heap, (entry[1], entry[0]))
+        return taken
+
+
+class ReviewScheduler:
+    """
+    SM-2 spaced repetition over word ids.
+
+    Review queues are loaded per user on first use and kept in an LRU of
+    `maxsize` users. Words from completed units that were never reviewed
+    have no rows: they are served from the word catalog after the due
+    reviews. Outcomes are applied in memory and written back by a single
+    task in batches of upserts, coalesced per (user, word). A failed batch
+    is re-queued unless a newer outcome is already waiting, and dropped
+    after `max_attempts` tries. Other workers are told to reload a user's
+    queue only once that user's outcomes have been written.
+    """
+
+    def __init__(
+        self,
+        catalog: WordCatalog,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_attempts: int = 5,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.catalog = catalog
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.queues: "OrderedDict[int, ReviewQueue]" = OrderedDict()
+        # user id -> word id -> state waiting to be written
+        self.pending: Dict[int, Dict[int, ReviewState]] = {}
+        self.pending_count = 0
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = False
+        self.metrics = metrics or Metrics()
+        self.flush_duration = self.metrics.histogram(
+            "review_flush_seconds", "Time to persist one batch of review outcomes"
+        )
+        self.written = 0
+        self.failed = 0
+        self.retried = 0
+        self.backplane = None
+
+    def attach(self, backplane):
+        self.backplane = backplane
+        backplane.add_handler("reviews.invalidate", self._handle_invalidate)
+
+    def start(self):
+        if self.task is None:
+            self.stopping = False
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.stopping = True
+        self.wakeup.set()
+        if self.task:
+            await self.task
+            self.task = None
+        while self.pending:
+            await self.flush()
+
+    async def get(self, user_id: int) -> ReviewQueue:
+        queue = self.queues.get(user_id)
+        if queue is not None:
+            self.queues.move_to_end(user_id)
+            return queue
+        queue = ReviewQueue()
+        rows = await Review.filter(user_id=user_id).values_list(
+            "word_id", "repetitions", "interval", "ease", "due_at"
+        )
+        for word_id, repetitions, interval, ease, due_at in rows:
+            queue.set(
+                word_id,
+                ReviewState(repetitions, interval, ease, _timestamp(due_at)),
+            )
+        for word_id, state in self.pending.get(user_id, {}).items():
+            queue.set(word_id, state)
+        existing = self.queues.get(user_id)
+        if existing is not None:
+            return existing
+        self.queues[user_id] = queue
+        while len(self.queues) > self.maxsize:
+            self.queues.popitem(last=False)
+        return queue
+
+    async def next_words(
+        self, user_id: int, completed_unit: int, limit: int
+    ) -> List[Dict]:
+        """
+        Up to `limit` words to review: due reviews first, then words from
+        units 1..`completed_unit` that were never reviewed.
+        """
+        queue = await self.get(user_id)
+        now = time.time()
+        words = []
+        for word_id, due in queue.due(limit, now):
+            index = self.catalog.index_of(word_id)
+            if index is not None:
+                words.append(
+                    {
+                        "id": word_id,
+                        "data": self.catalog.data[index],
+                        "due_at": due,
+                        "new": False,
+                    }
+                )
+        end = min(
+            completed_unit * self.catalog.words_in_one_unit, len(self.catalog.ids)
+        )
+        ids = self.catalog.ids
+        if queue.cursor_ids is not ids:
+            queue.new_cursor, queue.cursor_ids = 0, ids
+        while queue.new_cursor < end and ids[queue.new_cursor] in queue.states:
+            queue.new_cursor += 1
+        index = queue.new_cursor
+        while len(words) < limit and index < end:
+            word_id = ids[index]
+            if word_id not in queue.states:
+                words.append(
+                    {
+                        "id": word_id,
+                        "data": self.catalog.data[index],
+                        "due_at": now,
+                        "new": True,
+                    }
+                )
+            index += 1
+        return words
+
+    async def record(self, user_id: int, word_id: int, quality: int) -> ReviewState:
+        queue = await self.get(user_id)
+        state = queue.states.get(word_id)
+        if state is None:
+            repetitions, interval, ease = 0, 0, DEFAULT_EASE
+        else:
+            repetitions, interval, ease = state.repetitions, state.interval, state.ease
+        repetitions, interval, ease = sm2(repetitions, interval, ease, quality)
+        state = ReviewState(repetitions, interval, ease, time.time() + interval * DAY)
+        queue.set(word_id, state)
+        user_pending = self.pending.setdefault(user_id, {})
+        if word_id not in user_pending:
+            self.pending_count += 1
+        user_pending[word_id] = state
+        if self.pending_count >= self.batch_size:
+            self.wakeup.set()
+        return state
+
+    def stats(self) -> Dict:
+        return {
+            "users": len(self.queues),
+            "pending": self.pending_count,
+            "written": self.written,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+    async def flush(self) -> bool:
+        """Write one batch; False if it failed and was re-queued or dropped."""
+        batch = []
+        while self.pending and len(batch) < self.batch_size:
+            user_id = next(iter(self.pending))
+            user_pending = self.pending[user_id]
+            while user_pending and len(batch) < self.batch_size:
+                word_id = next(iter(user_pending))
+                batch.append((user_id, word_id, user_pending.pop(word_id)))
+            if not user_pending:
+                del self.pending[user_id]
+        if not batch:
+            return True
+        self.pending_count -= len(batch)
+        started = time.perf_counter()
+        try:
+            await Review.bulk_create(
+                [
+                    Review(
+                        user_id=user_id,
+                        word_id=word_id,
+                        repetitions=state.repetitions,
+                        interval=state.interval,
+                        ease=state.ease,
+                        due_at=datetime.fromtimestamp(state.due, timezone.utc),
+                    )
+                    for user_id, word_id, state in batch
+                ],
+                on_conflict=["user_id", "word_id"],
+                update_fields=["repetitions", "interval", "ease", "due_at"],
+            )
+        except Exception:
+            logger.exception(
+                "Failed to persist review outcomes",
+                extra={"event": "reviews.error", "reviews": len(batch)},
+            )
+            self._requeue(batch)
+            return False
+        finally:
+            self.flush_duration.observe(time.perf_counter() - started)
+        self.written += len(batch)
+        if self.backplane:
+            for user_id in {user_id for user_id, _, _ in batch}:
+                self.backplane.broadcast("reviews.invalidate", {"user_id": user_id})
+        return True
+
+    def _requeue(self, batch: List[Tuple[int, int, ReviewState]]):
+        for user_id, word_id, state in batch:
+            if word_id in self.pending.get(user_id, ()):
+                # A newer outcome for this word is already waiting.
+                continue
+            state.attempts += 1
+            if state.attempts >= self.max_attempts:
+                self.failed += 1
+                continue
+            self.pending.setdefault(user_id, {})[word_id] = state
+            self.pending_count += 1
+            self.retried += 1
+
+    async def _handle_invalidate(self, payload: Dict):
+        self.queues.pop(payload["user_id"], None)
+
+    async def _run(self):
+        while not self.stopping:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            # Stop at a failed batch and retry it after the next interval.
+            while self.pending and await self.flush():
+                pass
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
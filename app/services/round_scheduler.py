@@ -0,0 +1,113 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.core.enums import GameStatus
+from app.services.metrics import Metrics
+
+if TYPE_CHECKING:
+    from app.services.game_manager import GameSession
+
+logger = logging.getLogger(__name__)
+
+
+class RoundScheduler:
+    """
+    Single task that drives the round deadlines of every game session.
+
+    Deadlines sit in a heap keyed by `loop.time()` (monotonic). Rescheduling
+    or cancelling a session just replaces its sequence number, and stale heap
+    entries are skipped when popped. `advance()` is called synchronously on
+    the scheduler task, so it must not await.
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.heap: List[Tuple[float, int, "GameSession"]] = []
+        self.entries: Dict["GameSession", int] = {}
+        self.sequence = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.last_drift = 0.0
+        self.max_drift = 0.0
+        self.fired = 0
+        self.metrics = metrics or Metrics()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def schedule(self, session: "GameSession", delay: float):
+        loop = asyncio.get_running_loop()
+        seq = next(self.sequence)
+        self.entries[session] = seq
+        heapq.heappush(self.heap, (loop.time() + delay, seq, session))
+        if self.heap[0][1] == seq:
+            self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def advance_now(self, session: "GameSession"):
+        if session in self.entries:
+            self.schedule(session, 0)
+
+    def cancel(self, session: "GameSession"):
+        self.entries.pop(session, None)
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def stats(self) -> Dict:
+        return {
+            "sessions": len(self.entries),
+            "heap_size": len(self.heap),
+            "fired": self.fired,
+            "last_drift": self.last_drift,
+            "max_drift": self.max_drift,
+        }
+
+    def _abort(self, session: "GameSession"):
+        """End a session whose round failed so it cannot stay registered."""
+        if session.game_status == GameStatus.finished:
+            return
+        try:
+            session.end_game()
+        except Exception:
+            logger.exception(
+                "Failed to end the game",
+                extra={"event": "round.error", "game_id": session.owner["username"]},
+            )
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.wakeup.clear()
+            now = loop.time()
+            while self.heap and self.heap[0][0] <= now:
+                deadline, seq, session = heapq.heappop(self.heap)
+                if self.entries.get(session) != seq:
+                    continue
+                del self.entries[session]
+                self.fired += 1
+                self.last_drift = now - deadline
+                self.max_drift = max(self.max_drift, self.last_drift)
+                self.metrics.round_drift.observe(self.last_drift)
+                try:
+                    session.advance()
+                except Exception:
+                    logger.exception(
+                        "Round failed, ending the game",
+                        extra={
+                            "event": "round.error",
+                            "game_id": session.owner["username"],
+                        },
+                    )
+                    self._abort(session)
+            handle = None
+            if self.heap:
+                handle = loop.call_at(self.heap[0][0], self.wakeup.set)
+            await self.wakeup.wait()
+            if handle:
+                handle.cancel()
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, Set
+
+
+class Player:
+    __slots__ = (
+        "id", "name", "username", "points", "position", "sent_points", "sent_position"
+    )
+
+    def __init__(self, id: int, name: str, username: str):
+        self.id = id
+        self.name = name
+        self.username = username
+        self.points = 0
+        self.position = 0
+        # Standing last published to clients, used to build deltas.
+        self.sent_points = 0
+        self.sent_position = 0
+
+    def as_user(self) -> Dict:
+        return {"id": self.id, "name": self.name, "username": self.username}
+
+
+class Scoreboard:
+    """
+    Players of a game keyed by username plus a ranking kept sorted by points.
+
+    Points only grow by whole steps, so an award swaps the player with the
+    first player of its points block and the ranking stays sorted in O(1).
+    Players touched by awards are tracked so `delta()` can publish only the
+    standings that changed since the previous call.
+    """
+
+    def __init__(self):
+        self.players: Dict[str, Player] = {}
+        self.ranking: List[Player] = []
+        self.block_start: Dict[int, int] = {}
+        self.changed: Set[Player] = set()
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, username: str):
+        return username in self.players
+
+    def get(self, username: str) -> Optional[Player]:
+        return self.players.get(username)
+
+    def usernames(self) -> List[str]:
+        return list(self.players)
+
+    def users(self) -> List[Dict]:
+        return [player.as_user() for player in self.players.values()]
+
+    def add(self, user: Dict) -> bool:
+        if user["username"] in self.players:
+            return False
+        player = Player(user["id"], user["name"], user["username"])
+        player.position = player.sent_position = len(self.ranking)
+        self.players[player.username] = player
+        self.ranking.append(player)
+        self.block_start.setdefault(0, player.position)
+        return True
+
+    def award(self, player: Player, points: int = 1):
+        for _ in range(points):
+            self._increment(player)
+
+    def result(self) -> List[Dict]:
+        return [
+            {"user": player.as_user(), "point": player.points}
+            for player in self.ranking
+        ]
+
+    def snapshot(self) -> List[List]:
+        """Full standings as `[username, position, points]` rows."""
+        return [
+            [player.username, player.position, player.points]
+            for player in self.ranking
+        ]
+
+    def delta(self) -> List[List]:
+        """
+        `[username, position, points]` rows for the players whose standing
+        changed since the last call, ordered by position.
+        """
+        rows = []
+        for player in sorted(self.changed, key=lambda player: player.position):
+            if (
+                player.position != player.sent_position
+                or player.points != player.sent_points
+            ):
+                player.sent_position = player.position
+                player.sent_points = player.points
+                rows.append([player.username, player.position, player.points])
+        self.changed.clear()
+        return rows
+
+    def _increment(self, player: Player):
+        points = player.points
+        start = self.block_start[points]
+        first = self.ranking[start]
+        self.ranking[start], self.ranking[player.position] = player, first
+        first.position, player.position = player.position, start
+        self.changed.add(first)
+        self.changed.add(player)
+        after = start + 1
+        if after < len(self.ranking) and self.ranking[after].points == points:
+            self.block_start[points] = after
+        else:
+            del self.block_start[points]
+        player.points = points + 1
+        self.block_start.setdefault(points + 1, start)
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models.models import User
+
+
+class UserCache:
+    """
+    Bounded LRU cache of decoded token subjects and user rows with a TTL.
+
+    Handlers that modify a user must call `invalidate_user` after saving.
+    When attached to a backplane, invalidations reach every worker.
+    Cached rows can still be stale, so writes must name their columns
+    (`save(update_fields=...)` or a filtered `update()`) rather than save
+    the whole row back.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.tokens: "OrderedDict[str, tuple]" = OrderedDict()
+        self.users: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.backplane = None
+
+    def attach(self, backplane):
+        self.backplane = backplane
+        backplane.add_handler("invalidate_user", self._handle_invalidate)
+
+    def get_token_subject(self, token: str) -> Optional[str]:
+        return self._get(self.tokens, token)
+
+    def set_token_subject(self, token: str, username: str, exp: Optional[float]):
+        ttl = self.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl > 0:
+            self._set(self.tokens, token, username, ttl)
+
+    def get_user(self, username: str) -> Optional[User]:
+        return self._get(self.users, username)
+
+    def set_user(self, user: User):
+        self._set(self.users, user.username, user, self.ttl)
+
+    def invalidate_user(self, username: str):
+        self.users.pop(username, None)
+        if self.backplane:
+            self.backplane.broadcast("invalidate_user", {"username": username})
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens": len(self.tokens),
+            "users": len(self.users),
+        }
+
+    async def _handle_invalidate(self, payload: Dict):
+        self.users.pop(payload["username"], None)
+
+    def _get(self, store: OrderedDict, key: str):
+        entry = store.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del store[key]
+            self.misses += 1
+            return None
+        store.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _set(self, store: OrderedDict, key: str, value, ttl: float):
+        store[key] = (self.clock() + ttl, value)
+        store.move_to_end(key)
+        while len(store) > self.maxsize:
+            store.popitem(last=False)
@@ -0,0 +1,154 @@
+import bisect
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.models.models import User
+
+GRAM_SIZE = 3
+
+
+def grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class UserSearchIndex:
+    """
+    In-memory trigram index over usernames and display names.
+
+    Queries of three or more characters intersect trigram postings and then
+    confirm the substring. Shorter queries take username prefixes from a
+    sorted list and, when those are not enough, fall back to a linear
+    substring scan. Results rank exact username, username prefix, name
+    prefix, then any substring match.
+    """
+
+    def __init__(self):
+        self.users: Dict[int, Tuple[str, str]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.sorted_usernames: List[Tuple[str, int]] = []
+        self.backplane = None
+
+    def __len__(self):
+        return len(self.users)
+
+    def attach(self, backplane):
+        self.backplane = backplane
+        backplane.add_handler("user_search.upsert", self._handle_upsert)
+
+    async def load(self):
+        rows = await User.all().values_list("id", "username", "name")
+        self.users.clear()
+        self.postings.clear()
+        self.sorted_usernames = []
+        for user_id, username, name in rows:
+            self._add(user_id, username, name)
+            self.sorted_usernames.append((username, user_id))
+        self.sorted_usernames.sort()
+
+    def upsert(self, user_id: int, username: str, name: str):
+        self._upsert(user_id, username, name)
+        if self.backplane:
+            self.backplane.broadcast(
+                "user_search.upsert",
+                {"id": user_id, "username": username, "name": name},
+            )
+
+    def search(
+        self, query: str, exclude: Iterable[int] = (), limit: int = 10
+    ) -> List[Dict]:
+        query = query.strip().casefold()
+        if not query:
+            return []
+        exclude = set(exclude)
+        if len(query) < GRAM_SIZE:
+            candidates = self._short_candidates(query, limit + len(exclude))
+        else:
+            candidates = self._gram_candidates(query)
+        ranked = []
+        for user_id in candidates:
+            if user_id in exclude:
+                continue
+            username, name = self.users[user_id]
+            rank = self._rank(query, username, name.casefold())
+            if rank is not None:
+                ranked.append((rank, len(username), username, user_id))
+        ranked.sort()
+        return [
+            {"id": user_id, "username": username, "name": self.users[user_id][1]}
+            for _, _, username, user_id in ranked[:limit]
+        ]
+
+    def _rank(self, query: str, username: str, name: str):
+        if username == query:
+            return 0
+        if username.startswith(query):
+            return 1
+        if name.startswith(query):
+            return 2
+        if query in username or query in name:
+            return 3
+        return None
+
+    def _gram_candidates(self, query: str) -> Set[int]:
+        postings = sorted(
+            (self.postings.get(gram, set()) for gram in grams(query)), key=len
+        )
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def _short_candidates(self, query: str, limit: int) -> List[int]:
+        candidates = self._prefix_candidates(query, limit)
+        if len(candidates) >= limit:
+            return candidates
+        seen = set(candidates)
+        for user_id, (username, name) in self.users.items():
+            if user_id in seen:
+                continue
+            if query in username or query in name.casefold():
+                candidates.append(user_id)
+                if len(candidates) >= limit:
+                    break
+        return candidates
+
+    def _prefix_candidates(self, query: str, limit: int) -> List[int]:
+        index = bisect.bisect_left(self.sorted_usernames, (query, -1))
+        candidates = []
+        while index < len(self.sorted_usernames) and len(candidates) < limit:
+            username, user_id = self.sorted_usernames[index]
+            if not username.startswith(query):
+                break
+            candidates.append(user_id)
+            index += 1
+        return candidates
+
+    def _upsert(self, user_id: int, username: str, name: str):
+        previous = self.users.get(user_id)
+        if previous:
+            self._remove(user_id, *previous)
+        self._add(user_id, username, name)
+        bisect.insort(self.sorted_usernames, (username, user_id))
+
+    def _add(self, user_id: int, username: str, name: str):
+        self.users[user_id] = (username, name)
+        for gram in grams(username) | grams(name.casefold()):
+            self.postings.setdefault(gram, set()).add(user_id)
+
+    def _remove(self, user_id: int, username: str, name: str):
+        for gram in grams(username) | grams(name.casefold()):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(user_id)
+                if not posting:
+                    del self.postings[gram]
+        entry = (username, user_id)
+        index = bisect.bisect_left(self.sorted_usernames, entry)
+        if index < len(self.sorted_usernames) and self.sorted_usernames[index] == entry:
+            self.sorted_usernames.pop(index)
+
+    async def _handle_upsert(self, payload: Dict):
+        self._upsert(payload["id"], payload["username"], payload["name"])
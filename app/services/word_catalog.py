@@ -0,0 +1,170 @@
+import asyncio
+import bisect
+import logging
+import sys
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from tortoise.functions import Count, Max
+from tortoise.signals import post_delete, post_save
+
+from app.models.models import Word
+
+logger = logging.getLogger(__name__)
+
+
+class WordCatalog:
+    """
+    In-memory copy of the `words` table ordered by id.
+
+    Units are contiguous slices of the array, so a unit fetch is a slice
+    instead of an OFFSET query.
+
+    Saves and deletes made through this process reload the catalog. Changes
+    made by other processes are noticed by the periodic refresh, which only
+    compares the row count and the largest id: inserts and deletes are
+    picked up, but an UPDATE of existing rows elsewhere is not until the
+    next restart or local change.
+    """
+
+    def __init__(self, words_in_one_unit: int, units_in_one_book: int):
+        self.words_in_one_unit = words_in_one_unit
+        self.units_in_one_book = units_in_one_book
+        self.ids = array("q")
+        self.data: List[dict] = []
+        self.memory_bytes = 0
+        self._fingerprint = (0, 0)
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        # Set by local changes; cleared when a reload starts.
+        self._dirty = False
+        self._listeners: List[Callable[["WordCatalog"], None]] = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    async def start(self, refresh_interval: int):
+        post_save(Word)(self._on_word_changed)
+        post_delete(Word)(self._on_word_changed)
+        await self.load()
+        if refresh_interval > 0:
+            self._refresh_task = asyncio.create_task(
+                self._refresh_loop(refresh_interval)
+            )
+
+    def on_load(self, listener: Callable[["WordCatalog"], None]):
+        """Call `listener(catalog)` after every (re)load."""
+        self._listeners.append(listener)
+
+    async def stop(self):
+        for task in (self._refresh_task, self._reload_task):
+            if task:
+                task.cancel()
+
+    async def load(self):
+        async with self._lock:
+            rows = await Word.all().order_by("id").values_list("id", "data")
+            ids = array("q")
+            data = []
+            for word_id, word_data in rows:
+                ids.append(word_id)
+                data.append(word_data)
+            self.ids, self.data = ids, data
+            self._fingerprint = (len(ids), ids[-1] if ids else 0)
+            self.memory_bytes = self._measure()
+            for listener in self._listeners:
+                listener(self)
+
+    async def refresh_if_changed(self) -> bool:
+        fingerprint = await self._fetch_fingerprint()
+        if fingerprint == self._fingerprint:
+            return False
+        await self.load()
+        return True
+
+    def unit_bounds(self, book: int, unit: int):
+        start = (
+            (book - 1) * self.units_in_one_book + (unit - 1)
+        ) * self.words_in_one_unit
+        return start, start + self.words_in_one_unit
+
+    @property
+    def books_count(self) -> int:
+        words_in_one_book = self.words_in_one_unit * self.units_in_one_book
+        return -(-len(self.ids) // words_in_one_book)
+
+    def index_of(self, word_id: int) -> Optional[int]:
+        index = bisect.bisect_left(self.ids, word_id)
+        if index < len(self.ids) and self.ids[index] == word_id:
+            return index
+        return None
+
+    def get_unit(self, book: int, unit: int) -> List[Dict]:
+        start, end = self.unit_bounds(book, unit)
+        return [{"data": word_data} for word_data in self.data[start:end]]
+
+    def stats(self) -> Dict:
+        return {
+            "words": len(self.ids),
+            "memory_bytes": self.memory_bytes,
+        }
+
+    async def _fetch_fingerprint(self):
+        row = (
+            await Word.annotate(count=Count("id"), max_id=Max("id"))
+            .first()
+            .values("count", "max_id")
+        )
+        if not row:
+            return (0, 0)
+        return (row["count"] or 0, row["max_id"] or 0)
+
+    async def _refresh_loop(self, interval: int):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self._dirty:
+                    self._schedule_reload()
+                else:
+                    await self.refresh_if_changed()
+            except Exception:
+                logger.exception(
+                    "Failed to refresh the word catalog",
+                    extra={"event": "word_catalog.error"},
+                )
+
+    async def _on_word_changed(self, *args, **kwargs):
+        self._dirty = True
+        self._schedule_reload()
+
+    def _schedule_reload(self):
+        if self._reload_task and not self._reload_task.done():
+            return
+        self._reload_task = asyncio.create_task(self._reload_while_dirty())
+
+    async def _reload_while_dirty(self):
+        """Reload until no change arrived during the previous reload."""
+        while self._dirty:
+            self._dirty = False
+            try:
+                await self.load()
+            except Exception:
+                # Leave it dirty so the refresh loop or the next change
+                # tries again.
+                self._dirty = True
+                logger.exception(
+                    "Failed to reload the word catalog",
+                    extra={"event": "word_catalog.error"},
+                )
+                return
+
+    def _measure(self) -> int:
+        size = sys.getsizeof(self.ids) + sys.getsizeof(self.data)
+        for word_data in self.data:
+            size += sys.getsizeof(word_data)
+            for key, variants in word_data.items():
+                size += sys.getsizeof(key) + sys.getsizeof(variants)
+                if isinstance(variants, list):
+                    size += sum(sys.getsizeof(variant) for variant in variants)
+        return size
@@ -0,0 +1,41 @@
+import random
+from typing import List, Optional, Tuple
+
+from app.services.word_catalog import WordCatalog
+
+
+class WordSampler:
+    """
+    Draws distinct random words from the in-memory catalog.
+
+    `random.sample` over a `range` only touches the chosen indexes, so a draw
+    costs O(k) regardless of the dictionary size.
+    """
+
+    def __init__(self, catalog: WordCatalog, rng: Optional[random.Random] = None):
+        self.catalog = catalog
+        self.rng = rng or random.Random()
+
+    def sample_with_ids(
+        self, k: int, first_unit: int = 1, last_unit: Optional[int] = None
+    ) -> Tuple[List[int], List[dict]]:
+        """
+        Return the ids and data dicts of up to `k` distinct words from units
+        `first_unit`..`last_unit` (absolute unit numbers, inclusive).
+        """
+        ids, data = self.catalog.ids, self.catalog.data
+        indexes = self._indexes(k, first_unit, last_unit)
+        return [ids[index] for index in indexes], [data[index] for index in indexes]
+
+    def _indexes(
+        self, k: int, first_unit: int, last_unit: Optional[int]
+    ) -> List[int]:
+        data = self.catalog.data
+        words_in_one_unit = self.catalog.words_in_one_unit
+        start = min((max(first_unit, 1) - 1) * words_in_one_unit, len(data))
+        end = len(data)
+        if last_unit is not None:
+            end = min(end, last_unit * words_in_one_unit)
+        if end <= start:
+            return []
+        return self.rng.sample(range(start, end), min(k, end - start))
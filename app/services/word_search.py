@@ -0,0 +1,179 @@
+import bisect
+import heapq
+from typing import Dict, List, Set, Tuple
+
+from app.services.answer_matcher import normalize_answer
+from app.services.word_catalog import WordCatalog
+
+LANGUAGES = ("en", "uz")
+# The Uzbek oʻ/gʻ and tutuq belgisi are typed with several apostrophes.
+APOSTROPHES = str.maketrans({"ʻ": "'", "ʼ": "'", "‘": "'", "`": "'"})
+MAX_PREFIX_CANDIDATES = 500
+
+
+def normalize(text: str) -> str:
+    return normalize_answer(text.translate(APOSTROPHES))
+
+
+def tokens(text: str) -> Set[str]:
+    """Words of a normalized variant, plus the parts of hyphenated words."""
+    words = text.split()
+    parts = {part for word in words if "-" in word for part in word.split("-")}
+    parts.discard("")
+    return set(words) | parts
+
+
+class _LanguageIndex:
+    """Token postings and a sorted token list for one language."""
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = {}
+        self.sorted_tokens: List[str] = []
+        # word id -> ((normalized, original) variants, tokens)
+        self.words: Dict[int, Tuple[List[Tuple[str, str]], Set[str]]] = {}
+        self.dirty = False
+
+    def add(self, word_id: int, variants: List[str]):
+        normalized = [
+            (normalize(variant), variant)
+            for variant in variants
+            if isinstance(variant, str)
+        ]
+        word_tokens = set()
+        for text, _ in normalized:
+            word_tokens |= tokens(text)
+        self.words[word_id] = (normalized, word_tokens)
+        for token in word_tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                self.dirty = True
+            posting.add(word_id)
+
+    def remove(self, word_id: int):
+        entry = self.words.pop(word_id, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.discard(word_id)
+                if not posting:
+                    del self.postings[token]
+                    self.dirty = True
+
+    def commit(self):
+        if self.dirty:
+            self.sorted_tokens = sorted(self.postings)
+            self.dirty = False
+
+    def candidates(self, query_tokens: List[str]) -> Set[int]:
+        """
+        Words containing every complete query token and a token starting
+        with the last one, which may still be being typed.
+        """
+        *complete, prefix = query_tokens
+        if complete:
+            postings = sorted(
+                (self.postings.get(token, set()) for token in complete), key=len
+            )
+            found = set(postings[0])
+            for posting in postings[1:]:
+                found &= posting
+            return {
+                word_id
+                for word_id in found
+                if any(token.startswith(prefix) for token in self.words[word_id][1])
+            }
+        found = set()
+        index = bisect.bisect_left(self.sorted_tokens, prefix)
+        while (
+            index < len(self.sorted_tokens) and len(found) < MAX_PREFIX_CANDIDATES
+        ):
+            token = self.sorted_tokens[index]
+            if not token.startswith(prefix):
+                break
+            found |= self.postings[token]
+            index += 1
+        return found
+
+
+class WordSearchIndex:
+    """
+    In-memory inverted index over the en and uz variants of every word.
+
+    Variants are normalized like game answers and split into tokens. A
+    query matches words that contain all of its tokens, the last one as a
+    prefix, so it works as autocomplete. Results rank an exact variant
+    first, then variants starting with the query, then other matches,
+    shorter variants and dictionary order breaking ties. The index follows
+    the word catalog: after each catalog load only added, changed or
+    removed words are re-indexed.
+    """
+
+    def __init__(self):
+        self.indexes = {language: _LanguageIndex() for language in LANGUAGES}
+        self.data: Dict[int, dict] = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def update(self, catalog: WordCatalog):
+        current = dict(zip(catalog.ids, catalog.data))
+        for word_id in self.data.keys() - current.keys():
+            self._remove(word_id)
+        for word_id, data in current.items():
+            previous = self.data.get(word_id)
+            if previous is data or previous == data:
+                continue
+            if previous is not None:
+                self._remove(word_id)
+            self._add(word_id, data)
+        self.data = current
+        for index in self.indexes.values():
+            index.commit()
+
+    def search(self, query: str, language: str, limit: int = 10) -> List[Dict]:
+        """Words whose `language` variants match `query`, best first."""
+        text = normalize(query)
+        query_tokens = text.split()
+        if not query_tokens:
+            return []
+        index = self.indexes[language]
+        ranked = []
+        for word_id in index.candidates(query_tokens):
+            ranked.append(
+                min(
+                    (self._rank(text, normalized), len(normalized), word_id, original)
+                    for normalized, original in index.words[word_id][0]
+                )
+            )
+        return [
+            {"id": word_id, "match": original, "data": self.data[word_id]}
+            for _, _, word_id, original in heapq.nsmallest(limit, ranked)
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            "words": len(self.data),
+            **{
+                f"{language}_tokens": len(index.postings)
+                for language, index in self.indexes.items()
+            },
+        }
+
+    def _rank(self, query: str, variant: str) -> int:
+        if variant == query:
+            return 0
+        if variant.startswith(query):
+            return 1
+        return 2
+
+    def _add(self, word_id: int, data: dict):
+        for language, index in self.indexes.items():
+            variants = data.get(language) if isinstance(data, dict) else None
+            index.add(word_id, variants if isinstance(variants, list) else [])
+
+    def _remove(self, word_id: int):
+        for index in self.indexes.values():
+            index.remove(word_id)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class Recorder:
+    """Latency samples and counters grouped by name."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.windows: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, started: float, finished: float):
+        self.samples[name].append(finished - started)
+        window = self.windows.setdefault(name, [started, finished])
+        window[0] = min(window[0], started)
+        window[1] = max(window[1], finished)
+
+    def error(self, name: str):
+        self.errors[name] += 1
+
+    def count(self, name: str):
+        self.counts[name] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        return {
+            name: summarize(samples, self.windows[name], self.errors.get(name, 0))
+            for name, samples in sorted(self.samples.items())
+        }
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], window=None, errors: int = 0) -> Dict:
+    ordered = sorted(samples)
+    elapsed = (window[1] - window[0]) if window else 0
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "throughput": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+class HTTPClient:
+    """
+    Minimal keep-alive HTTP/1.1 JSON client over asyncio streams, so the
+    benchmark needs nothing beyond the app's own dependencies.
+    """
+
+    def __init__(self, host: str, port: int, recorder: Recorder):
+        self.host = host
+        self.port = port
+        self.recorder = recorder
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        label: Optional[str] = None,
+        params: Optional[Dict] = None,
+        body: Optional[Dict] = None,
+        token: Optional[str] = None,
+    ) -> Tuple[int, object]:
+        label = label or f"{method} {path}"
+        target = path + ("?" + urlencode(params) if params else "")
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+        ]
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        raw = ("\r\n".join(headers) + "\r\n\r\n").encode() + payload
+        started = time.perf_counter()
+        try:
+            status, data = await self._roundtrip(raw)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close()
+            self.recorder.error(label)
+            raise
+        self.recorder.record(label, started, time.perf_counter())
+        if status >= 400:
+            self.recorder.error(label)
+        return status, data
+
+    async def _roundtrip(self, raw: bytes) -> Tuple[int, object]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self.writer.write(raw)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        length = 0
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value.strip())
+            elif name == "connection" and value.strip().lower() == "close":
+                close = True
+        body = await self.reader.readexactly(length) if length else b""
+        if close:
+            await self.close()
+        return status, json.loads(body) if body else None
+
+
+class ServerThread:
+    """
+    Runs the ASGI app with uvicorn on its own event loop in a background
+    thread and samples that loop's lag.
+    """
+
+    def __init__(self, app, host: str, port: int, lag_interval: float = 0.05):
+        import uvicorn
+
+        self.config = uvicorn.Config(
+            app, host=host, port=port, log_level="warning", lifespan="on"
+        )
+        self.server = uvicorn.Server(self.config)
+        self.lag_interval = lag_interval
+        self.lag_samples: List[float] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self, timeout: float = 30):
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("Server did not start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+    def run_coroutine(self, coro, timeout: float = 60):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(self._sample_lag())
+        self.loop.run_until_complete(self.server.serve())
+
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(
+                max(0.0, loop.time() - started - self.lag_interval)
+            )
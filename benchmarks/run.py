@@ -0,0 +1,369 @@
+"""
+Offline load test for the HTTP and WebSocket paths.
+
+Starts `app.main:app` against a throwaway SQLite database, simulates users
+that register, log in, read units, exchange friend requests and play full
+games over `/ws/`, and writes a JSON report.
+
+    python -m benchmarks.run --users 40 --output bench.json
+    python -m benchmarks.run --compare bench.json --output new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.harness import HTTPClient, Recorder, ServerThread, summarize
+
+HOST = "127.0.0.1"
+PASSWORD = "password123"
+
+
+def configure_environment(database_path: str, args):
+    os.environ.update(
+        {
+            "DATABASE_URI": f"sqlite://{database_path}",
+            "POSTGRES_USER": "bench",
+            "POSTGRES_PASSWORD": "bench",
+            "POSTGRES_SERVER": "localhost",
+            "POSTGRES_DB": "bench",
+            "SECRET_KEY": "benchmark-secret-key",
+            "WORDS_COUNT": str(args.words),
+            "ROUND_DURATION": str(args.round_duration),
+            "WORD_CATALOG_REFRESH_INTERVAL": "0",
+            "BACKPLANE": "local",
+        }
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def seed_words(count: int):
+    from app.core.config import WORD_CATALOG
+    from app.models.models import Word
+
+    await Word.all().delete()
+    await Word.bulk_create(
+        [Word(data={"en": [f"en{i}"], "uz": [f"uz{i}"]}) for i in range(count)],
+        batch_size=500,
+    )
+    await WORD_CATALOG.load()
+
+
+class SimulatedUser:
+    def __init__(self, index: int, port: int, recorder: Recorder):
+        self.username = f"benchuser{index:05d}"
+        self.name = f"Bench {index}"
+        self.port = port
+        self.recorder = recorder
+        self.http = HTTPClient(HOST, port, recorder)
+        self.token = None
+        self.id = None
+        self.ws = None
+        self.reader_task = None
+        self.game_id = None
+        self.answer_sent_at = None
+        self.game_finished = asyncio.Event()
+        self.messages: Dict[str, int] = {}
+
+    async def register(self):
+        status, data = await self.http.request(
+            "POST",
+            "/auth/register",
+            body={"username": self.username, "password": PASSWORD, "name": self.name},
+        )
+        if status == 201:
+            self.token = data["token"]
+
+    async def login(self):
+        status, data = await self.http.request(
+            "POST",
+            "/auth/login",
+            body={"username": self.username, "password": PASSWORD},
+        )
+        if status == 200:
+            self.token = data["token"]
+
+    async def browse(self, units: int, books: int, units_in_book: int):
+        await self.http.request("GET", "/auth/me", token=self.token)
+        await self.http.request("GET", "/dict/", token=self.token)
+        for _ in range(units):
+            await self.http.request(
+                "GET",
+                "/dict/words",
+                params={
+                    "book": random.randint(1, books),
+                    "unit": random.randint(1, units_in_book),
+                },
+                token=self.token,
+            )
+
+    async def befriend(self, other: "SimulatedUser"):
+        status, users = await self.http.request(
+            "GET", "/friends/search", params={"query": other.username}, token=self.token
+        )
+        match = next((u for u in users or [] if u["username"] == other.username), None)
+        if match is None:
+            return
+        await self.http.request(
+            "POST",
+            "/friends/send-request",
+            params={"user_id": match["id"]},
+            token=self.token,
+        )
+        status, requests = await other.http.request(
+            "GET", "/friends/requests", token=other.token
+        )
+        for request in requests or []:
+            if request["requester"]["username"] == self.username:
+                await other.http.request(
+                    "POST",
+                    "/friends/accept-request",
+                    params={"request_id": request["id"]},
+                    token=other.token,
+                )
+        await self.http.request("GET", "/friends/all", token=self.token)
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(
+            f"ws://{HOST}:{self.port}/ws/?token={self.token}", max_queue=None
+        )
+        self.reader_task = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self.ws:
+            await self.ws.close()
+        if self.reader_task:
+            self.reader_task.cancel()
+        await self.http.close()
+
+    async def _read(self):
+        async for raw in self.ws:
+            received = time.perf_counter()
+            message = json.loads(raw)
+            type = message["type"]
+            self.recorder.count(f"ws_in {type}")
+            if type in ("correct_answer", "incorrect_answer", "already_answered"):
+                if self.answer_sent_at is not None:
+                    self.recorder.record(
+                        "ws send_answer", self.answer_sent_at, received
+                    )
+                    self.answer_sent_at = None
+            elif type == "next_word":
+                asyncio.create_task(self._answer(message["data"]["word"]))
+            elif type == "end_game":
+                self.game_finished.set()
+
+    async def _answer(self, uz_words: List[str]):
+        await asyncio.sleep(random.uniform(0.01, 0.2))
+        word = uz_words[0].replace("uz", "en", 1)
+        if random.random() < 0.2:
+            word = "wrong"
+        self.answer_sent_at = time.perf_counter()
+        self.recorder.count("ws_out send_answer")
+        await self.ws.send(
+            json.dumps(
+                {
+                    "type": "send_answer",
+                    "data": {"game_username": self.game_id, "answer": word},
+                }
+            )
+        )
+
+
+async def play_game(group: List[SimulatedUser], recorder: Recorder, timeout: float):
+    owner, guests = group[0], group[1:]
+    for player in group:
+        player.game_id = owner.username
+        player.game_finished.clear()
+    status, _ = await owner.http.request(
+        "POST",
+        "/game/create",
+        body={"users": [guest.username for guest in guests]},
+        token=owner.token,
+    )
+    if status != 201:
+        return
+    await asyncio.gather(
+        *(
+            guest.http.request(
+                "POST",
+                "/game/join",
+                params={"game_id": owner.username},
+                token=guest.token,
+            )
+            for guest in guests
+        )
+    )
+    started = time.perf_counter()
+    await owner.http.request("POST", "/game/start", token=owner.token)
+    try:
+        await asyncio.wait_for(owner.game_finished.wait(), timeout)
+        recorder.record("game full", started, time.perf_counter())
+    except asyncio.TimeoutError:
+        recorder.error("game full")
+
+
+async def bounded(coroutines, limit: int):
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(c) for c in coroutines), return_exceptions=True)
+
+
+async def scenario(args, port: int, recorder: Recorder) -> Dict[str, float]:
+    users = [SimulatedUser(i, port, recorder) for i in range(args.users)]
+    phases = {}
+
+    async def phase(name, coroutines):
+        started = time.perf_counter()
+        await bounded(coroutines, args.concurrency)
+        phases[name] = time.perf_counter() - started
+
+    await phase("register", (user.register() for user in users))
+    await phase("login", (user.login() for user in users))
+    await phase(
+        "browse",
+        (
+            user.browse(args.unit_reads, args.books, args.units_in_book)
+            for user in users
+        ),
+    )
+    await phase(
+        "friends",
+        (users[i].befriend(users[i + 1]) for i in range(0, len(users) - 1, 2)),
+    )
+    await phase("connect", (user.connect() for user in users))
+    groups = [
+        users[i:i + args.players]
+        for i in range(0, len(users) - args.players + 1, args.players)
+    ]
+    started = time.perf_counter()
+    for _ in range(args.games):
+        await asyncio.gather(
+            *(play_game(group, recorder, args.game_timeout) for group in groups)
+        )
+    phases["games"] = time.perf_counter() - started
+    await asyncio.gather(*(user.close() for user in users), return_exceptions=True)
+    return phases
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(str(Path(directory) / "bench.sqlite3"), args)
+        from app.main import app
+
+        port = free_port()
+        server = ServerThread(app, HOST, port)
+        server.start()
+        try:
+            server.run_coroutine(seed_words(args.words))
+            recorder = Recorder()
+            started = time.perf_counter()
+            phases = asyncio.run(scenario(args, port, recorder))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.stop()
+
+    summary = recorder.summary()
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "users": args.users,
+            "players": args.players,
+            "games": args.games,
+            "elapsed_s": elapsed,
+            "phases_s": phases,
+        },
+        "http": {
+            k: v for k, v in summary.items() if not k.startswith(("ws ", "game "))
+        },
+        "ws": {k: v for k, v in summary.items() if k.startswith("ws ")},
+        "games": {k: v for k, v in summary.items() if k.startswith("game ")},
+        "messages": dict(sorted(recorder.counts.items())),
+        "loop_lag": summarize(server.lag_samples),
+    }
+
+
+def compare(previous: Dict, current: Dict, threshold: float) -> bool:
+    regressed = False
+    print(f"{'metric':45} {'old p99':>10} {'new p99':>10} {'change':>8}")
+    for section in ("http", "ws", "games"):
+        for name, stats in current.get(section, {}).items():
+            old = previous.get(section, {}).get(name)
+            if not old or not old["p99_ms"]:
+                continue
+            change = stats["p99_ms"] / old["p99_ms"] - 1
+            flag = " !" if change > threshold else ""
+            regressed |= change > threshold
+            print(
+                f"{name:45} {old['p99_ms']:10.2f} {stats['p99_ms']:10.2f} "
+                f"{change:+8.1%}{flag}"
+            )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4, help="players per game")
+    parser.add_argument("--games", type=int, default=1, help="games per group")
+    parser.add_argument("--words", type=int, default=3600)
+    parser.add_argument("--books", type=int, default=6)
+    parser.add_argument("--units-in-book", type=int, default=30)
+    parser.add_argument("--unit-reads", type=int, default=10)
+    parser.add_argument("--round-duration", type=int, default=2)
+    parser.add_argument("--game-timeout", type=float, default=120)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous JSON report to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed p99 regression"
+    )
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        if compare(previous, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()